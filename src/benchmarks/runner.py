@@ -0,0 +1,406 @@
+import argparse
+import collections.abc as collections_abc
+import contextlib
+import dataclasses
+import functools
+import inspect
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import typing
+
+import psycopg2
+
+import settings
+import slides.a_iterators.app as iterators_app
+import slides.b_load.app as load_app
+import slides.b_load.sqlite_app as sqlite_load_app
+import slides.c_extract.app as extract_app
+import slides.c_extract.sqlite_app as sqlite_extract_app
+import utils.chunking as chunking_utils
+import utils.psycopg2 as psycopg2_utils
+import utils.sqlite3 as sqlite3_utils
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_CHUNK_SIZES = [100, 500]
+DEFAULT_REPEATS = 5
+DEFAULT_WARMUP = 1
+DEFAULT_THRESHOLD = 1.2
+LAYERS_COUNT = 5
+UNCHUNKED_SUITES = {"a_iterators"}
+LOAD_PARAMETERS = ("connection", "users")
+EXTRACT_PARAMETERS = ("connection",)
+TRANSFER_PARAMETERS = ("source_connection", "target_connection")
+
+
+@dataclasses.dataclass
+class Case:
+    name: str
+    run: collections_abc.Callable[[], None]
+    cleanup: collections_abc.Callable[[], None] = lambda: None
+
+
+@dataclasses.dataclass
+class Result:
+    suite: str
+    name: str
+    backend: str
+    size: int
+    chunk_size: int
+    median_time: float
+    p95_time: float
+    peak_memory: int
+
+    @property
+    def key(self) -> tuple[str, str, str, int, int]:
+        return self.suite, self.name, self.backend, self.size, self.chunk_size
+
+
+Suite = collections_abc.Callable[[int, int], typing.ContextManager[list[Case]]]
+
+
+def discover_strategies(
+    module: types.ModuleType, parameters: tuple[str, ...]
+) -> list[collections_abc.Callable[..., typing.Any]]:
+    strategies = []
+    for _, member in inspect.getmembers(module, inspect.isfunction):
+        wrapped = getattr(member, "__wrapped__", None)
+        if wrapped is None or wrapped.__module__ != module.__name__:
+            continue
+        if tuple(inspect.signature(wrapped).parameters) == parameters:
+            strategies.append(wrapped)
+    return strategies
+
+
+def discover_functions(module: types.ModuleType, suffix: str) -> list[collections_abc.Callable[..., typing.Any]]:
+    return [
+        member
+        for name, member in inspect.getmembers(module, inspect.isfunction)
+        if name.endswith(suffix) and member.__module__ == module.__name__
+    ]
+
+
+def consume(items: collections_abc.Iterable[typing.Any]) -> None:
+    for _ in items:
+        ...
+
+
+def run_with_users(
+    strategy: collections_abc.Callable[..., typing.Any], connection: typing.Any, users: list[typing.Any]
+) -> None:
+    strategy(connection, iter(users))
+
+
+def run_consumed(func: collections_abc.Callable[..., typing.Any], argument: typing.Any) -> None:
+    consume(func(argument))
+
+
+@contextlib.contextmanager
+def patch_constants(module: types.ModuleType, **constants: typing.Any) -> collections_abc.Iterator[None]:
+    previous = {name: getattr(module, name) for name in constants}
+    for name, value in constants.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(module, name, value)
+
+
+def postgres_available() -> bool:
+    try:
+        with contextlib.closing(psycopg2.connect(**settings.POSTGRESQL_DATABASE_SETTINGS, connect_timeout=2)):
+            return True
+    except psycopg2.OperationalError:
+        return False
+
+
+@contextlib.contextmanager
+def iterators_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    def make_case(layer: collections_abc.Callable[..., typing.Any]) -> Case:
+        def run() -> None:
+            items: collections_abc.Iterable[int] = range(size)
+            for _ in range(LAYERS_COUNT):
+                items = layer(items)
+            consume(items)
+
+        return Case(name=f"{layer.__name__}_x{LAYERS_COUNT}", run=run)
+
+    def make_stages_case(stages: collections_abc.Callable[..., typing.Any]) -> Case:
+        return Case(name=stages.__name__, run=functools.partial(run_consumed, stages, range(size)))
+
+    yield [
+        *(make_case(layer) for layer in discover_functions(iterators_app, "_layer")),
+        *(make_stages_case(stages) for stages in discover_functions(iterators_app, "_stages")),
+    ]
+
+
+@contextlib.contextmanager
+def postgres_load_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    with patch_constants(load_app, SIZE=size, CHUNK_SIZE=chunk_size), psycopg2_utils.open_connection(
+        settings.POSTGRESQL_DATABASE_SETTINGS
+    ) as connection:
+        load_app.create_tables(connection)
+        users = list(load_app.gen_fake_users())
+        try:
+            yield [
+                Case(
+                    name=strategy.__name__,
+                    run=functools.partial(run_with_users, strategy, connection, users),
+                    cleanup=functools.partial(load_app.truncate_tables, connection),
+                )
+                for strategy in discover_strategies(load_app, LOAD_PARAMETERS)
+            ]
+        finally:
+            connection.rollback()
+            load_app.drop_tables(connection)
+
+
+@contextlib.contextmanager
+def postgres_extract_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    with patch_constants(extract_app, SIZE=size, CHUNK_SIZE=chunk_size), psycopg2_utils.open_connection(
+        settings.POSTGRESQL_DATABASE_SETTINGS
+    ) as connection:
+        extract_app.create_tables(connection)
+        extract_app.load_data(connection)
+        extractor = psycopg2_utils.Extractor(connection, chunk_size)
+        users = list(extractor.extract_with_keyset(extract_app.ExtractUser, "users", key=["id"]))
+        try:
+            yield [
+                *(
+                    Case(
+                        name=strategy.__name__,
+                        run=functools.partial(run_consumed, strategy, connection),
+                        cleanup=connection.rollback,
+                    )
+                    for strategy in discover_strategies(extract_app, EXTRACT_PARAMETERS)
+                ),
+                *(
+                    Case(name=strategy.__name__, run=functools.partial(run_with_users, strategy, connection, users))
+                    for strategy in discover_strategies(extract_app, LOAD_PARAMETERS)
+                ),
+            ]
+        finally:
+            connection.rollback()
+            extract_app.drop_tables(connection)
+
+
+@contextlib.contextmanager
+def sqlite_load_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    with tempfile.TemporaryDirectory() as directory, patch_constants(
+        sqlite_load_app, SIZE=size, CHUNK_SIZE=chunk_size
+    ), sqlite3_utils.open_connection({"database": os.path.join(directory, "benchmark.sqlite3")}) as connection:
+        sqlite_load_app.create_tables(connection)
+        users = sqlite_load_app.gen_fake_users()
+        yield [
+            Case(
+                name=strategy.__name__,
+                run=functools.partial(run_with_users, strategy, connection, users),
+                cleanup=functools.partial(sqlite_load_app.truncate_tables, connection),
+            )
+            for strategy in discover_strategies(sqlite_load_app, LOAD_PARAMETERS)
+        ]
+
+
+@contextlib.contextmanager
+def sqlite_extract_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    with tempfile.TemporaryDirectory() as directory, patch_constants(
+        sqlite_extract_app, SIZE=size, CHUNK_SIZE=chunk_size
+    ), sqlite3_utils.open_connection({"database": os.path.join(directory, "benchmark.sqlite3")}) as connection:
+        sqlite_extract_app.create_tables(connection)
+        sqlite_extract_app.load_data(connection)
+        yield [
+            Case(name=strategy.__name__, run=functools.partial(run_consumed, strategy, connection))
+            for strategy in discover_strategies(sqlite_extract_app, EXTRACT_PARAMETERS)
+        ]
+
+
+@contextlib.contextmanager
+def sqlite_transfer_suite(size: int, chunk_size: int) -> collections_abc.Iterator[list[Case]]:
+    with tempfile.TemporaryDirectory() as directory, patch_constants(
+        sqlite_extract_app, SIZE=size, TRANSFER_CHUNK_SIZE=chunk_size
+    ), sqlite3_utils.open_connection(
+        {"database": os.path.join(directory, "benchmark.sqlite3")}
+    ) as source_connection, psycopg2_utils.open_connection(
+        settings.POSTGRESQL_DATABASE_SETTINGS
+    ) as target_connection:
+        sqlite_extract_app.create_tables(source_connection)
+        sqlite_extract_app.load_data(source_connection)
+        sqlite_extract_app.create_target_tables(target_connection)
+        try:
+            yield [
+                Case(
+                    name=strategy.__name__,
+                    run=functools.partial(strategy, source_connection, target_connection),
+                    cleanup=functools.partial(sqlite_extract_app.truncate_target_tables, target_connection),
+                )
+                for strategy in discover_strategies(sqlite_extract_app, TRANSFER_PARAMETERS)
+            ]
+        finally:
+            target_connection.rollback()
+            sqlite_extract_app.drop_target_tables(target_connection)
+
+
+def get_suites(backend: str) -> dict[str, Suite]:
+    if backend == "postgresql":
+        return {
+            "a_iterators": iterators_suite,
+            "b_load": postgres_load_suite,
+            "c_extract": postgres_extract_suite,
+            "sqlite_transfer": sqlite_transfer_suite,
+        }
+    return {
+        "a_iterators": iterators_suite,
+        "b_load": sqlite_load_suite,
+        "c_extract": sqlite_extract_suite,
+    }
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def measure(case: Case, repeats: int, warmup: int) -> tuple[list[float], int]:
+    for _ in range(warmup):
+        case.run()
+        case.cleanup()
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter() - start)
+        case.cleanup()
+
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        case.cleanup()
+    return times, peak_memory
+
+
+def run_benchmarks(
+    backend: str,
+    suites: collections_abc.Sequence[str],
+    sizes: collections_abc.Sequence[int],
+    chunk_sizes: collections_abc.Sequence[int],
+    repeats: int,
+    warmup: int,
+) -> list[Result]:
+    results = []
+    available_suites = get_suites(backend)
+    for suite_name in suites:
+        suite = available_suites.get(suite_name)
+        if suite is None:
+            print(f"skipping {suite_name}: not available for {backend}", file=sys.stderr)
+            continue
+        for size in sizes:
+            for chunk_size in [0] if suite_name in UNCHUNKED_SUITES else chunk_sizes:
+                with suite(size, chunk_size) as cases:
+                    for case in cases:
+                        times, peak_memory = measure(case, repeats, warmup)
+                        result = Result(
+                            suite=suite_name,
+                            name=case.name,
+                            backend=backend,
+                            size=size,
+                            chunk_size=chunk_size,
+                            median_time=statistics.median(times),
+                            p95_time=percentile(times, 0.95),
+                            peak_memory=peak_memory,
+                        )
+                        print(
+                            f"{suite_name}.{case.name} size={size} chunk_size={chunk_size}: "
+                            f"median {result.median_time * 1000:,.3f} ms, p95 {result.p95_time * 1000:,.3f} ms, "
+                            f"max_memory {peak_memory / 1000_000:,.3f} mb",
+                            file=sys.stderr,
+                        )
+                        results.append(result)
+    return results
+
+
+def compare(results: list[Result], baseline: list[Result], threshold: float) -> list[tuple[Result, Result]]:
+    baseline_by_key = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_key.get(result.key)
+        if previous is None or not previous.median_time:
+            continue
+        ratio = result.median_time / previous.median_time
+        print(f"{'.'.join(map(str, result.key))}: {ratio:.2f}x baseline", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append((result, previous))
+    return regressions
+
+
+def load_results(path: str) -> list[Result]:
+    with open(path) as file:
+        return [Result(**result) for result in json.load(file)]
+
+
+def dump_results(results: list[Result], file: typing.TextIO) -> None:
+    json.dump([dataclasses.asdict(result) for result in results], file, indent=2)
+    file.write("\n")
+
+
+def parse_chunk_size(value: str) -> int:
+    chunk_size = int(value)
+    if chunk_size < chunking_utils.MIN_CHUNK_SIZE:
+        raise argparse.ArgumentTypeError(
+            f"chunk size must be at least {chunking_utils.MIN_CHUNK_SIZE}, got {chunk_size}"
+        )
+    return chunk_size
+
+
+def main(argv: typing.Optional[collections_abc.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run slide strategies over a matrix of sizes and chunk sizes.")
+    parser.add_argument("--suite", action="append", dest="suites")
+    parser.add_argument("--size", action="append", type=int, dest="sizes")
+    parser.add_argument("--chunk-size", action="append", type=parse_chunk_size, dest="chunk_sizes")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--backend", choices=["postgresql", "sqlite"])
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    backend = args.backend or ("postgresql" if postgres_available() else "sqlite")
+    results = run_benchmarks(
+        backend=backend,
+        suites=args.suites or list(get_suites(backend)),
+        sizes=args.sizes or DEFAULT_SIZES,
+        chunk_sizes=args.chunk_sizes or DEFAULT_CHUNK_SIZES,
+        repeats=args.repeats,
+        warmup=args.warmup,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            dump_results(results, file)
+    else:
+        dump_results(results, sys.stdout)
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        for result, previous in regressions:
+            print(
+                f"regression: {'.'.join(map(str, result.key))} "
+                f"{previous.median_time * 1000:,.3f} ms -> {result.median_time * 1000:,.3f} ms",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import utils.psycopg2 as psycopg2_utils
+import utils.sqlite3 as sqlite3_utils
 
 POSTGRESQL_DATABASE_SETTINGS: psycopg2_utils.DbSettings = {
     "dbname": "etl-generators",
@@ -7,3 +8,7 @@ POSTGRESQL_DATABASE_SETTINGS: psycopg2_utils.DbSettings = {
     "host": "127.0.0.1",
     "port": 6437,
 }
+
+SQLITE_DATABASE_SETTINGS: sqlite3_utils.DbSettings = {
+    "database": "etl-generators.sqlite3",
+}
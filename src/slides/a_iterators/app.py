@@ -1,11 +1,14 @@
 import collections.abc as collections_abc
+import itertools
 import typing
 
+import utils.fusion as fusion_utils
 import utils.profilers as profiler_utils
 
 T = typing.TypeVar("T")
 
 SIZE = 10_000_000
+BATCH_SIZE = 1_000
 
 
 @profiler_utils.profile
@@ -34,6 +37,67 @@ def expression_layer(items: collections_abc.Iterable[T]) -> collections_abc.Iter
     return (item for item in items)
 
 
+def map_stage(
+    items: collections_abc.Iterable[T], func: collections_abc.Callable[[T], T]
+) -> collections_abc.Iterator[T]:
+    for item in items:
+        yield func(item)
+
+
+def filter_stage(
+    items: collections_abc.Iterable[T], predicate: collections_abc.Callable[[T], bool]
+) -> collections_abc.Iterator[T]:
+    for item in items:
+        if predicate(item):
+            yield item
+
+
+def increment(item: int) -> int:
+    return item + 1
+
+
+def double(item: int) -> int:
+    return item * 2
+
+
+def is_odd(item: int) -> bool:
+    return item % 2 == 1
+
+
+def is_not_multiple_of_three(item: int) -> bool:
+    return item % 3 != 0
+
+
+FUSED_STAGES = (
+    fusion_utils.Chain().map(increment).filter(is_odd).map(double).filter(is_not_multiple_of_three).map(increment)
+)
+
+
+def layered_stages(items: collections_abc.Iterable[int]) -> collections_abc.Iterator[int]:
+    items = map_stage(items, increment)
+    items = filter_stage(items, is_odd)
+    items = map_stage(items, double)
+    items = filter_stage(items, is_not_multiple_of_three)
+    return map_stage(items, increment)
+
+
+INLINED_STAGES = (
+    fusion_utils.Chain().map("item + 1").filter("item % 2 == 1").map("item * 2").filter("item % 3 != 0").map("item + 1")
+)
+
+
+def fused_stages(items: collections_abc.Iterable[int]) -> collections_abc.Iterator[int]:
+    return FUSED_STAGES(items)
+
+
+def fused_inlined_stages(items: collections_abc.Iterable[int]) -> collections_abc.Iterator[int]:
+    return INLINED_STAGES(items)
+
+
+def fused_inlined_batched_stages(items: collections_abc.Iterable[int]) -> collections_abc.Iterator[int]:
+    return itertools.chain.from_iterable(INLINED_STAGES.run_batches(items, BATCH_SIZE))
+
+
 # @profiler_utils.profile
 def range_generator() -> collections_abc.Iterator[int]:
     yield from range(SIZE)
@@ -73,6 +137,17 @@ def run_different_iteration_styles() -> None:
     )
 
 
+def run_stage_fusion() -> None:
+    run_baseline()
+
+    run_through_iterable(layered_stages(range(SIZE)), "range with 5 map/filter generator layers")
+    run_through_iterable(fused_stages(range(SIZE)), "range with 5 map/filter steps fused into one loop")
+    run_through_iterable(fused_inlined_stages(range(SIZE)), "range with 5 inlined map/filter steps in one loop")
+    run_through_iterable(
+        fused_inlined_batched_stages(range(SIZE)), "range with 5 inlined map/filter steps run in batches"
+    )
+
+
 def run_range_vs_list() -> None:
     run_baseline()
 
@@ -3,15 +3,19 @@ import dataclasses
 import itertools
 import typing
 
-import faker
 import more_itertools
 
 import settings
+import utils.chunking as chunking_utils
 import utils.profilers as profiler_utils
 import utils.psycopg2 as psycopg2_utils
+import utils.synthetic as synthetic_utils
 
 SIZE = 10_000
+SEED = 42
 CHUNK_SIZE = 500
+TARGET_CHUNK_TIME = 0.05
+TARGET_CHUNK_BYTES = 1_000_000
 
 
 def create_tables(connection: psycopg2_utils.Connection) -> None:
@@ -36,7 +40,7 @@ def truncate_tables(connection: psycopg2_utils.Connection) -> None:
 
 def drop_tables(connection: psycopg2_utils.Connection) -> None:
     with connection.cursor() as cursor:
-        cursor.execute("TRUNCATE users")
+        cursor.execute("DROP TABLE users")
     connection.commit()
 
 
@@ -47,11 +51,12 @@ class User:
 
 
 def gen_fake_users() -> collections_abc.Iterator[User]:
-    fake = faker.Faker()
-    return (User(name=fake.name(), description=fake.text()) for _ in range(SIZE))
+    return synthetic_utils.generate_rows(User, synthetic_utils.get_user_columns(SEED), SIZE, SEED)
 
 
-ExecuteType = collections_abc.Callable[[psycopg2_utils.Connection, typing.Iterator[User]], None]
+ExecuteType = collections_abc.Callable[
+    [psycopg2_utils.Connection, typing.Iterator[User]], typing.Optional[chunking_utils.ChunkStats]
+]
 
 
 @profiler_utils.profile
@@ -113,9 +118,39 @@ def execute_single_query_chunks(connection: psycopg2_utils.Connection, users: co
             connection.commit()
 
 
+@profiler_utils.profile
+def loader_values_chunks(connection: psycopg2_utils.Connection, users: collections_abc.Iterator[User]) -> None:
+    loader = psycopg2_utils.Loader(connection, CHUNK_SIZE)
+    loader.values_from_iterable(users, User, "users")
+
+
+@profiler_utils.profile
+def copy_chunks(connection: psycopg2_utils.Connection, users: collections_abc.Iterator[User]) -> None:
+    stmt = "COPY users (name, description) FROM STDIN"
+    with connection.cursor() as cursor:
+        for user_chunk in more_itertools.ichunked(users, CHUNK_SIZE):
+            data = ((user.name, user.description) for user in user_chunk)
+            cursor.copy_expert(stmt, psycopg2_utils.CopyReader(data))
+            connection.commit()
+
+
+@profiler_utils.profile
+def copy_chunks_adaptive(
+    connection: psycopg2_utils.Connection, users: collections_abc.Iterator[User]
+) -> chunking_utils.ChunkStats:
+    sizer = chunking_utils.AdaptiveChunkSizer(
+        CHUNK_SIZE, target_time=TARGET_CHUNK_TIME, target_bytes=TARGET_CHUNK_BYTES
+    )
+    loader = psycopg2_utils.Loader(connection, sizer)
+    loader.copy_from_iterable(users, User, "users")
+    return sizer.stats
+
+
 def run_execution(func: ExecuteType, connection: psycopg2_utils.Connection) -> None:
     users = gen_fake_users()
-    func(connection, users)
+    stats = func(connection, users)
+    if stats is not None:
+        print(f" chunk sizes: {stats.min_chunk_size}..{stats.max_chunk_size}, last {stats.chunk_sizes[-1]}")
     truncate_tables(connection)
     print("-" * 100)
 
@@ -130,6 +165,9 @@ def run() -> None:
             run_execution(execute_chunks, connection)
             run_execution(executemany_chunks, connection)
             run_execution(execute_single_query_chunks, connection)
+            run_execution(loader_values_chunks, connection)
+            run_execution(copy_chunks, connection)
+            run_execution(copy_chunks_adaptive, connection)
         finally:
             drop_tables(connection)
 
@@ -0,0 +1,161 @@
+import collections.abc as collections_abc
+import dataclasses
+import time
+import typing
+
+import settings
+import utils.change_detection as change_detection_utils
+import utils.chunking as chunking_utils
+import utils.profilers as profiler_utils
+import utils.sqlite3 as sqlite3_utils
+import utils.synthetic as synthetic_utils
+
+SIZE = 50_000
+SEED = 42
+CHUNK_SIZE = 500
+TARGET_CHUNK_TIME = 0.05
+TARGET_CHUNK_BYTES = 1_000_000
+REPLAY_CHANGED_EVERY = 20
+
+
+def create_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users(
+            id integer primary key,
+            name text NOT NULL,
+            description text NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_snapshots(
+            id integer NOT NULL,
+            name text NOT NULL,
+            description text NOT NULL
+        )
+        """
+    )
+    connection.commit()
+
+
+def truncate_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute("DELETE FROM users")
+    connection.execute("DELETE FROM user_snapshots")
+    connection.commit()
+
+
+def drop_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute("DROP TABLE users")
+    connection.execute("DROP TABLE user_snapshots")
+    connection.commit()
+
+
+@dataclasses.dataclass
+class User:
+    name: str
+    description: str
+
+
+@dataclasses.dataclass
+class UserSnapshot:
+    id: int
+    name: str
+    description: str
+
+
+def gen_fake_users() -> list[User]:
+    return list(synthetic_utils.generate_rows(User, synthetic_utils.get_user_columns(SEED), SIZE, SEED))
+
+
+ExecuteType = collections_abc.Callable[
+    [sqlite3_utils.Connection, collections_abc.Iterator[User]], typing.Optional[chunking_utils.ChunkStats]
+]
+
+
+@profiler_utils.profile
+def execute_single(connection: sqlite3_utils.Connection, users: collections_abc.Iterator[User]) -> None:
+    for user in users:
+        connection.execute("INSERT INTO users (name, description) VALUES (?, ?)", (user.name, user.description))
+        connection.commit()
+
+
+@profiler_utils.profile
+def loader_chunks(connection: sqlite3_utils.Connection, users: collections_abc.Iterator[User]) -> None:
+    loader = sqlite3_utils.Loader(connection, CHUNK_SIZE)
+    loader.load_from_iterable(users, User, "users")
+
+
+@profiler_utils.profile
+def loader_chunks_fast_ingest(connection: sqlite3_utils.Connection, users: collections_abc.Iterator[User]) -> None:
+    loader = sqlite3_utils.Loader(connection, CHUNK_SIZE, fast_ingest=True)
+    loader.load_from_iterable(users, User, "users")
+
+
+@profiler_utils.profile
+def loader_chunks_adaptive(
+    connection: sqlite3_utils.Connection, users: collections_abc.Iterator[User]
+) -> chunking_utils.ChunkStats:
+    sizer = chunking_utils.AdaptiveChunkSizer(
+        CHUNK_SIZE, target_time=TARGET_CHUNK_TIME, target_bytes=TARGET_CHUNK_BYTES
+    )
+    loader = sqlite3_utils.Loader(connection, sizer)
+    loader.load_from_iterable(users, User, "users")
+    return sizer.stats
+
+
+def run_execution(func: ExecuteType, connection: sqlite3_utils.Connection, users: list[User]) -> None:
+    start = time.perf_counter()
+    stats = func(connection, iter(users))
+    elapsed_time = time.perf_counter() - start
+    print(f" rows/sec: {len(users) / elapsed_time:,.0f}")
+    if stats is not None:
+        print(f" chunk sizes: {stats.min_chunk_size}..{stats.max_chunk_size}, last {stats.chunk_sizes[-1]}")
+    truncate_tables(connection)
+    print("-" * 100)
+
+
+@profiler_utils.profile
+def load_changed_snapshots(
+    connection: sqlite3_utils.Connection, snapshots: list[UserSnapshot]
+) -> change_detection_utils.ChangeStats:
+    detector = change_detection_utils.ChangeDetector(
+        sqlite3_utils.HashIndex(connection, "user_snapshots"), UserSnapshot, key=["id"]
+    )
+    loader = sqlite3_utils.Loader(connection, CHUNK_SIZE)
+    loader.load_from_iterable(
+        detector.filter_changed(snapshots), UserSnapshot, "user_snapshots", on_chunk=detector.save_chunk
+    )
+    return detector.stats
+
+
+def run_replay(connection: sqlite3_utils.Connection, users: list[User]) -> None:
+    snapshots = [UserSnapshot(id=i, name=user.name, description=user.description) for i, user in enumerate(users)]
+    for step in ["initial", "replay"]:
+        if step == "replay":
+            for snapshot in snapshots[::REPLAY_CHANGED_EVERY]:
+                snapshot.description += " (edited)"
+        stats = load_changed_snapshots(connection, snapshots)
+        print(f" {step}: {stats}")
+    truncate_tables(connection)
+    sqlite3_utils.HashIndex(connection, "user_snapshots").clear()
+    print("-" * 100)
+
+
+def run() -> None:
+    users = gen_fake_users()
+    with sqlite3_utils.open_connection(settings.SQLITE_DATABASE_SETTINGS) as connection:
+        create_tables(connection)
+        try:
+            run_execution(execute_single, connection, users)
+            run_execution(loader_chunks, connection, users)
+            run_execution(loader_chunks_fast_ingest, connection, users)
+            run_execution(loader_chunks_adaptive, connection, users)
+            run_replay(connection, users)
+        finally:
+            drop_tables(connection)
+
+
+if __name__ == "__main__":
+    run()
@@ -3,15 +3,22 @@ import dataclasses
 import itertools
 import typing
 
-import faker
 import psycopg2.extras as psycopg2_extras
 
 import settings
 import utils.profilers as profiler_utils
 import utils.psycopg2 as psycopg2_utils
+import utils.rows as rows_utils
+import utils.sqlite3 as sqlite3_utils
+import utils.synthetic as synthetic_utils
 
 SIZE = 50_000
+SEED = 42
 CHUNK_SIZE = 500
+PARALLEL_CONNECTIONS = 4
+UPSERT_COPY_CHUNK_SIZE = 10_000
+CHECKPOINT_SOURCE = "postgresql.users"
+CHECKPOINT_JOB = "users_to_sqlite"
 
 
 @dataclasses.dataclass
@@ -21,8 +28,7 @@ class LoadUser:
 
 
 def gen_fake_users() -> collections_abc.Iterator[LoadUser]:
-    fake = faker.Faker()
-    return (LoadUser(name=fake.name(), description=fake.text()) for _ in range(SIZE))
+    return synthetic_utils.generate_rows(LoadUser, synthetic_utils.get_user_columns(SEED), SIZE, SEED)
 
 
 def create_tables(connection: psycopg2_utils.Connection) -> None:
@@ -58,6 +64,19 @@ class ExtractUser:
     description: str
 
 
+@dataclasses.dataclass(slots=True)
+class SlotsExtractUser:
+    id: int
+    name: str
+    description: str
+
+
+class TupleExtractUser(typing.NamedTuple):
+    id: int
+    name: str
+    description: str
+
+
 ExecuteType = collections_abc.Callable[[psycopg2_utils.Connection], collections_abc.Iterable[ExtractUser]]
 
 
@@ -141,9 +160,150 @@ def fetch_last_id(connection: psycopg2_utils.Connection) -> collections_abc.Iter
             last_id = user["id"]
 
 
+@profiler_utils.profile
+def fetch_all_list_row_mapper(connection: psycopg2_utils.Connection) -> list[SlotsExtractUser]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id, name, description FROM users ORDER BY id")
+        row_mapper = psycopg2_utils.make_row_mapper(SlotsExtractUser, cursor)
+        return list(row_mapper(cursor.fetchall()))
+
+
+def fetch_many_row_mapper(
+    connection: psycopg2_utils.Connection, target: typing.Type[rows_utils.T]
+) -> collections_abc.Iterator[rows_utils.T]:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id, name, description FROM users ORDER BY id")
+        row_mapper = psycopg2_utils.make_row_mapper(target, cursor)
+        while users_chunk := cursor.fetchmany(size=CHUNK_SIZE):
+            yield from row_mapper(users_chunk)
+
+
+@profiler_utils.profile
+def fetch_many_row_mapper_dataclass(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    yield from fetch_many_row_mapper(connection, ExtractUser)
+
+
+@profiler_utils.profile
+def fetch_many_row_mapper_slots(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[SlotsExtractUser]:
+    yield from fetch_many_row_mapper(connection, SlotsExtractUser)
+
+
+@profiler_utils.profile
+def fetch_many_row_mapper_namedtuple(
+    connection: psycopg2_utils.Connection,
+) -> collections_abc.Iterator[TupleExtractUser]:
+    yield from fetch_many_row_mapper(connection, TupleExtractUser)
+
+
+@profiler_utils.profile
+def fetch_many_row_mapper_tuple(
+    connection: psycopg2_utils.Connection,
+) -> collections_abc.Iterator[tuple[typing.Any, ...]]:
+    yield from fetch_many_row_mapper(connection, tuple)
+
+
+@profiler_utils.profile
+def extractor_server_cursor(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = psycopg2_utils.Extractor(connection, CHUNK_SIZE)
+    yield from extractor.extract_with_cursor(ExtractUser, "users", order_by=["id"])
+
+
+@profiler_utils.profile
+def extractor_keyset(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = psycopg2_utils.Extractor(connection, CHUNK_SIZE)
+    yield from extractor.extract_with_keyset(ExtractUser, "users", key=["id"])
+
+
+@profiler_utils.profile
+def parallel_extractor_ordered(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = psycopg2_utils.ParallelExtractor(
+        settings.POSTGRESQL_DATABASE_SETTINGS, PARALLEL_CONNECTIONS, CHUNK_SIZE
+    )
+    yield from extractor.extract(ExtractUser, "users", key=["id"], ordered=True)
+
+
+@profiler_utils.profile
+def parallel_extractor_unordered(connection: psycopg2_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = psycopg2_utils.ParallelExtractor(
+        settings.POSTGRESQL_DATABASE_SETTINGS, PARALLEL_CONNECTIONS, CHUNK_SIZE
+    )
+    yield from extractor.extract(ExtractUser, "users", key=["id"], ordered=False)
+
+
+@profiler_utils.profile
+def upsert_values(connection: psycopg2_utils.Connection, users: collections_abc.Iterable[ExtractUser]) -> None:
+    loader = psycopg2_utils.Loader(connection, CHUNK_SIZE)
+    loader.upsert_from_iterable(users, ExtractUser, "users", conflict_columns=["id"])
+
+
+@profiler_utils.profile
+def upsert_copy(connection: psycopg2_utils.Connection, users: collections_abc.Iterable[ExtractUser]) -> None:
+    loader = psycopg2_utils.Loader(connection, UPSERT_COPY_CHUNK_SIZE)
+    loader.copy_upsert_from_iterable(users, ExtractUser, "users", conflict_columns=["id"])
+
+
+def run_upsert_reload(connection: psycopg2_utils.Connection) -> None:
+    extractor = psycopg2_utils.Extractor(connection, CHUNK_SIZE)
+    users = list(extractor.extract_with_keyset(ExtractUser, "users", key=["id"]))
+    for func in [upsert_values, upsert_copy]:
+        for user in users:
+            user.name = user.name.upper() if func is upsert_values else user.name.lower()
+        func(connection, users)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM users")
+            [(count,)] = cursor.fetchall()
+        connection.rollback()
+        print(f" {func.__name__}: {len(users)} rows upserted, {count} rows in table")
+    print("-" * 100)
+
+
+def create_target_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users(
+            id integer primary key,
+            name text NOT NULL,
+            description text NOT NULL
+        )
+        """
+    )
+    connection.commit()
+
+
+@profiler_utils.profile
+def load_incremental(
+    source_connection: psycopg2_utils.Connection,
+    target_connection: sqlite3_utils.Connection,
+    store: sqlite3_utils.CheckpointStore,
+) -> None:
+    after = store.load(CHECKPOINT_SOURCE, CHECKPOINT_JOB)
+    extractor = psycopg2_utils.Extractor(source_connection, CHUNK_SIZE)
+    loader = sqlite3_utils.Loader(target_connection, CHUNK_SIZE)
+    users = extractor.extract_with_keyset(ExtractUser, "users", key=["id"], after=after)
+    loader.load_from_iterable(
+        users, ExtractUser, "users", on_chunk=store.track(CHECKPOINT_SOURCE, CHECKPOINT_JOB, ["id"])
+    )
+
+
+def run_incremental_load(connection: psycopg2_utils.Connection) -> None:
+    with sqlite3_utils.open_connection({"database": ":memory:"}) as target_connection:
+        create_target_tables(target_connection)
+        store = sqlite3_utils.CheckpointStore(target_connection)
+        for step in ["initial", "repeated", "after new rows"]:
+            if step == "after new rows":
+                load_data(connection)
+            load_incremental(connection, target_connection, store)
+            (count,) = target_connection.execute("SELECT count(*) FROM users").fetchone()
+            print(f" {step}: {count} rows, checkpoint {store.load(CHECKPOINT_SOURCE, CHECKPOINT_JOB)}")
+    connection.rollback()
+    print("-" * 100)
+
+
 def run_execution(func: ExecuteType, connection: psycopg2_utils.Connection) -> None:
     iterable = func(connection)
     run_through_iterable(iterable)
+    if isinstance(iterable, profiler_utils.ProfiledIterator):
+        profiler_utils.print_stats(iterable.stats)
     print("-" * 100)
 
 
@@ -159,6 +319,17 @@ def run() -> None:
             run_execution(fetch_many_yield, connection)
             run_execution(fetch_limit_offset, connection)
             run_execution(fetch_last_id, connection)
+            run_execution(fetch_all_list_row_mapper, connection)
+            run_execution(fetch_many_row_mapper_dataclass, connection)
+            run_execution(fetch_many_row_mapper_slots, connection)
+            run_execution(fetch_many_row_mapper_namedtuple, connection)
+            run_execution(fetch_many_row_mapper_tuple, connection)
+            run_execution(extractor_server_cursor, connection)
+            run_execution(extractor_keyset, connection)
+            run_execution(parallel_extractor_ordered, connection)
+            run_execution(parallel_extractor_unordered, connection)
+            run_upsert_reload(connection)
+            run_incremental_load(connection)
         finally:
             connection.rollback()
             drop_tables(connection)
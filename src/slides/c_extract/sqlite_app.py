@@ -0,0 +1,189 @@
+import collections.abc as collections_abc
+import dataclasses
+import time
+
+import settings
+import utils.profilers as profiler_utils
+import utils.psycopg2 as psycopg2_utils
+import utils.sqlite3 as sqlite3_utils
+import utils.synthetic as synthetic_utils
+
+SIZE = 50_000
+SEED = 42
+CHUNK_SIZE = 500
+TRANSFER_CHUNK_SIZE = 10_000
+
+
+@dataclasses.dataclass
+class LoadUser:
+    name: str
+    description: str
+
+
+@dataclasses.dataclass
+class ExtractUser:
+    id: int
+    name: str
+    description: str
+
+
+def gen_fake_users() -> collections_abc.Iterator[LoadUser]:
+    return synthetic_utils.generate_rows(LoadUser, synthetic_utils.get_user_columns(SEED), SIZE, SEED)
+
+
+def create_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users(
+            id integer primary key,
+            name text NOT NULL,
+            description text NOT NULL
+        )
+        """
+    )
+    connection.commit()
+
+
+def load_data(connection: sqlite3_utils.Connection) -> None:
+    loader = sqlite3_utils.Loader(connection, CHUNK_SIZE, fast_ingest=True)
+    loader.load_from_iterable(gen_fake_users(), LoadUser, "users")
+
+
+def drop_tables(connection: sqlite3_utils.Connection) -> None:
+    connection.execute("DROP TABLE users")
+    connection.commit()
+
+
+def create_target_tables(connection: psycopg2_utils.Connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sqlite_users(
+                id integer primary key,
+                name text NOT NULL,
+                description text NOT NULL
+            )
+            """
+        )
+    connection.commit()
+
+
+def truncate_target_tables(connection: psycopg2_utils.Connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE sqlite_users")
+    connection.commit()
+
+
+def drop_target_tables(connection: psycopg2_utils.Connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TABLE sqlite_users")
+    connection.commit()
+
+
+def run_through_iterable(items: collections_abc.Iterable[ExtractUser]) -> None:
+    for _ in items:
+        ...
+
+
+@profiler_utils.profile
+def fetch_all_list(connection: sqlite3_utils.Connection) -> list[ExtractUser]:
+    rows = connection.execute("SELECT id, name, description FROM users").fetchall()
+    return [ExtractUser(*row) for row in rows]
+
+
+@profiler_utils.profile
+def extractor_cursor(connection: sqlite3_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = sqlite3_utils.Extractor(connection, CHUNK_SIZE)
+    yield from extractor.extract_with_cursor(ExtractUser, "users")
+
+
+@profiler_utils.profile
+def extractor_rowid(connection: sqlite3_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = sqlite3_utils.Extractor(connection, CHUNK_SIZE)
+    yield from extractor.extract_with_rowid(ExtractUser, "users")
+
+
+@profiler_utils.profile
+def extractor_keyset(connection: sqlite3_utils.Connection) -> collections_abc.Iterator[ExtractUser]:
+    extractor = sqlite3_utils.Extractor(connection, CHUNK_SIZE)
+    yield from extractor.extract_with_keyset(ExtractUser, "users", key=["id"])
+
+
+ExecuteType = collections_abc.Callable[[sqlite3_utils.Connection], collections_abc.Iterable[ExtractUser]]
+TransferType = collections_abc.Callable[[sqlite3_utils.Connection, psycopg2_utils.Connection], None]
+
+
+@profiler_utils.profile
+def transfer_fetch_all_copy(
+    source_connection: sqlite3_utils.Connection, target_connection: psycopg2_utils.Connection
+) -> None:
+    loader = psycopg2_utils.Loader(target_connection, TRANSFER_CHUNK_SIZE)
+    rows = source_connection.execute("SELECT id, name, description FROM users").fetchall()
+    loader.copy_from_iterable([ExtractUser(*row) for row in rows], ExtractUser, "sqlite_users")
+
+
+@profiler_utils.profile
+def transfer_cursor_copy(
+    source_connection: sqlite3_utils.Connection, target_connection: psycopg2_utils.Connection
+) -> None:
+    extractor = sqlite3_utils.Extractor(source_connection, TRANSFER_CHUNK_SIZE)
+    loader = psycopg2_utils.Loader(target_connection, TRANSFER_CHUNK_SIZE)
+    loader.copy_from_iterable(extractor.extract_with_cursor(ExtractUser, "users"), ExtractUser, "sqlite_users")
+
+
+@profiler_utils.profile
+def transfer_rowid_copy(
+    source_connection: sqlite3_utils.Connection, target_connection: psycopg2_utils.Connection
+) -> None:
+    extractor = sqlite3_utils.Extractor(source_connection, TRANSFER_CHUNK_SIZE)
+    loader = psycopg2_utils.Loader(target_connection, TRANSFER_CHUNK_SIZE)
+    loader.copy_from_iterable(extractor.extract_with_rowid(ExtractUser, "users"), ExtractUser, "sqlite_users")
+
+
+def run_execution(func: ExecuteType, connection: sqlite3_utils.Connection) -> None:
+    iterable = func(connection)
+    run_through_iterable(iterable)
+    if isinstance(iterable, profiler_utils.ProfiledIterator):
+        profiler_utils.print_stats(iterable.stats)
+    print("-" * 100)
+
+
+def run_transfer(
+    func: TransferType, source_connection: sqlite3_utils.Connection, target_connection: psycopg2_utils.Connection
+) -> None:
+    start = time.perf_counter()
+    func(source_connection, target_connection)
+    elapsed_time = time.perf_counter() - start
+    print(f" rows/sec: {SIZE / elapsed_time:,.0f}")
+    truncate_target_tables(target_connection)
+    print("-" * 100)
+
+
+def run_transfers(connection: sqlite3_utils.Connection) -> None:
+    with psycopg2_utils.open_connection(settings.POSTGRESQL_DATABASE_SETTINGS) as target_connection:
+        create_target_tables(target_connection)
+        try:
+            run_transfer(transfer_fetch_all_copy, connection, target_connection)
+            run_transfer(transfer_cursor_copy, connection, target_connection)
+            run_transfer(transfer_rowid_copy, connection, target_connection)
+        finally:
+            target_connection.rollback()
+            drop_target_tables(target_connection)
+
+
+def run() -> None:
+    with sqlite3_utils.open_connection(settings.SQLITE_DATABASE_SETTINGS) as connection:
+        create_tables(connection)
+        load_data(connection)
+        try:
+            run_execution(fetch_all_list, connection)
+            run_execution(extractor_cursor, connection)
+            run_execution(extractor_rowid, connection)
+            run_execution(extractor_keyset, connection)
+            run_transfers(connection)
+        finally:
+            drop_tables(connection)
+
+
+if __name__ == "__main__":
+    run()
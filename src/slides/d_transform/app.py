@@ -1,12 +1,27 @@
+import asyncio
 import collections.abc as collections_abc
 import dataclasses
+import functools
 import itertools
+import operator
+import os
 import random
+import tempfile
 import typing
 
 import faker
 import more_itertools
 
+import utils.aio as aio_utils
+import utils.columnar as columnar_utils
+import utils.group as group_utils
+import utils.merge as merge_utils
+import utils.pipeline as pipeline_utils
+import utils.profilers as profiler_utils
+import utils.sort as sort_utils
+import utils.sqlite3 as sqlite3_utils
+import utils.staging as staging_utils
+
 
 def print_iterable(items: collections_abc.Iterable[typing.Any]) -> None:
     for item in items:
@@ -73,6 +88,41 @@ def run_pack() -> None:
     print_iterable(users)
 
 
+def run_pack_unsorted() -> None:
+    user_emails = list(gen_fake_user_emails())
+    random.shuffle(user_emails)
+    print_iterable(user_emails)
+
+    print("-" * 100)
+
+    sorted_user_emails = sort_utils.external_sort(user_emails, key=operator.attrgetter("user_id"), run_size=4)
+    users = transform_user_email_to_user(sorted_user_emails)
+    print_iterable(users)
+
+
+def add_user_email(user: User, user_email: UserEmail) -> User:
+    user.emails.append(user_email.email)
+    return user
+
+
+def run_pack_by_unsorted() -> None:
+    user_emails = list(gen_fake_user_emails())
+    random.shuffle(user_emails)
+    print_iterable(user_emails)
+
+    print("-" * 100)
+
+    users = group_utils.pack_by(
+        user_emails,
+        key=operator.attrgetter("user_id"),
+        factory=lambda user_id: User(id=user_id, emails=[]),
+        accumulate=add_user_email,
+        grouped=False,
+        max_groups=2,
+    )
+    print_iterable(users)
+
+
 def run_chunk() -> None:
     chunked_items = more_itertools.chunked(iterable=range(95), n=20)
     print_iterable(chunked_items)
@@ -123,6 +173,100 @@ def run_filter() -> None:
     print_iterable(filtered_users)
 
 
+def filter_even_id_columnar(
+    batches: collections_abc.Iterable[columnar_utils.ColumnarBatch],
+) -> collections_abc.Iterator[columnar_utils.ColumnarBatch]:
+    for batch in batches:
+        yield batch.compress(columnar_utils.compare(columnar_utils.compute(batch["id"], "%", 2), "!=", 0))
+
+
+def run_columnar_filter() -> None:
+    batches = columnar_utils.to_batches(gen_fake_users(), User, batch_size=2, typecodes={"id": "q"})
+    print_iterable(columnar_utils.from_batches(filter_even_id_columnar(batches), User))
+
+
+@dataclasses.dataclass
+class UserRow:
+    id: int
+
+
+def transform_user_to_rows(
+    users: collections_abc.Iterable[User],
+) -> collections_abc.Iterator[typing.Union[UserRow, UserEmail]]:
+    for user in users:
+        yield UserRow(id=user.id)
+        for email in user.emails:
+            yield UserEmail(user_id=user.id, email=email)
+
+
+def run_fan_out_load() -> None:
+    with sqlite3_utils.open_connection({"database": ":memory:"}) as connection:
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("CREATE TABLE users(id integer primary key)")
+        connection.execute(
+            "CREATE TABLE user_emails(user_id integer NOT NULL REFERENCES users(id), email text NOT NULL)"
+        )
+        loader = sqlite3_utils.FanOutLoader(connection, 4, tables=[(UserRow, "users"), (UserEmail, "user_emails")])
+        loader.load_from_iterable(transform_user_to_rows(gen_fake_users()))
+        print(loader.counts, list(loader.sizer.stats.chunk_sizes))
+        print_iterable(connection.execute("SELECT user_id, email FROM user_emails ORDER BY user_id"))
+
+
+def run_staged_fan_out() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "user_emails.stage")
+        with staging_utils.StagingWriter(path, UserEmail) as writer:
+            writer.write_many(transform_user_to_user_email(gen_fake_users()))
+
+        with staging_utils.StagingReader(path) as reader:
+            print_iterable(reader.rows(UserEmail))
+            print("-" * 100)
+            print_iterable(record.to_tuple() for record in reader.records() if record[0] % 2)
+            print("-" * 100)
+            print_iterable(reader.rows(UserEmail, start=len(reader) // 2))
+
+
+def run_threaded_pipeline() -> None:
+    pipeline_utils.run_pipeline(
+        source=gen_fake_users(),
+        transforms=[filter_even_id, transform_user_to_user_email],
+        sink=print_iterable,
+        chunk_size=2,
+        queue_size=2,
+    )
+
+
+async def async_transform_user_to_user_email(
+    users: collections_abc.AsyncIterable[User],
+) -> collections_abc.AsyncIterator[UserEmail]:
+    async for user in users:
+        for email in user.emails:
+            yield UserEmail(user_id=user.id, email=email)
+
+
+async def async_filter_even_id(users: collections_abc.AsyncIterable[User]) -> collections_abc.AsyncIterator[User]:
+    async for user in users:
+        if user.id % 2 == 0:
+            continue
+        yield user
+
+
+async def async_print_iterable(items: collections_abc.AsyncIterable[typing.Any]) -> None:
+    async for item in items:
+        print(item)
+
+
+def run_async_pipeline() -> None:
+    pipeline = aio_utils.run_async_pipeline(
+        source=aio_utils.aiterate(gen_fake_users()),
+        transforms=[async_filter_even_id, async_transform_user_to_user_email],
+        sink=async_print_iterable,
+        chunk_size=2,
+        queue_size=2,
+    )
+    asyncio.run(pipeline)
+
+
 T = typing.TypeVar("T")
 
 
@@ -141,12 +285,17 @@ def merge_emails(
     email2: typing.Optional[UserEmail] = None
 
     while True:
-        email1 = email1 or safe_next(email_iter1)
         if email1 is None:
+            email1 = safe_next(email_iter1)
+        if email1 is None:
+            if email2 is not None:
+                yield email2
             yield from email_iter2
             return
-        email2 = email2 or safe_next(email_iter2)
         if email2 is None:
+            email2 = safe_next(email_iter2)
+        if email2 is None:
+            yield email1
             yield from email_iter1
             return
 
@@ -174,12 +323,17 @@ def merge_users(
     user2: typing.Optional[User] = None
 
     while True:
-        user1 = user1 or safe_next(user_iter1)
         if user1 is None:
+            user1 = safe_next(user_iter1)
+        if user1 is None:
+            if user2 is not None:
+                yield user2
             yield from user_iter2
             return
-        user2 = user2 or safe_next(user_iter2)
         if user2 is None:
+            user2 = safe_next(user_iter2)
+        if user2 is None:
+            yield user1
             yield from user_iter1
             return
 
@@ -203,6 +357,48 @@ def run_merge_objects() -> None:
     print_iterable(emails)
 
 
+def combine_users(user1: User, user2: User) -> User:
+    return User(id=user1.id, emails=user1.emails + user2.emails)
+
+
+def run_merge_many_objects() -> None:
+    users = merge_utils.merge_sorted(
+        *(gen_fake_users() for _ in range(5)),
+        key=operator.attrgetter("id"),
+        combine=combine_users,
+    )
+    print_iterable(users)
+
+
+MERGE_STREAMS_COUNT = 32
+MERGE_STREAM_SIZE = 10_000
+
+
+def gen_sorted_users(seed: int) -> collections_abc.Iterator[User]:
+    rand = random.Random(seed)
+    for _id in sorted(rand.sample(range(MERGE_STREAM_SIZE * 4), MERGE_STREAM_SIZE)):
+        yield User(id=_id, emails=[f"{_id}-{seed}@example.com"])
+
+
+@profiler_utils.profile
+def merge_users_chained(streams: list[collections_abc.Iterator[User]]) -> None:
+    for _ in functools.reduce(merge_users, streams):
+        ...
+
+
+@profiler_utils.profile
+def merge_users_heap(streams: list[collections_abc.Iterator[User]]) -> None:
+    for _ in merge_utils.merge_sorted(*streams, key=operator.attrgetter("id"), combine=combine_users):
+        ...
+
+
+def run_merge_benchmark() -> None:
+    merge_users_chained([gen_sorted_users(seed) for seed in range(MERGE_STREAMS_COUNT)])
+    print("-" * 100)
+    merge_users_heap([gen_sorted_users(seed) for seed in range(MERGE_STREAMS_COUNT)])
+    print("-" * 100)
+
+
 run_merge_objects()
 
 
@@ -0,0 +1,89 @@
+import collections.abc as collections_abc
+import dataclasses
+import hashlib
+import os
+
+import utils.pipeline as pipeline_utils
+import utils.profilers as profiler_utils
+
+SIZE = 10_000
+CHUNK_SIZE = 500
+HASH_ROUNDS = 100
+
+
+@dataclasses.dataclass
+class UserEmail:
+    user_id: int
+    email: str
+
+
+@dataclasses.dataclass
+class ValidatedUserEmail:
+    user_id: int
+    email: str
+    domain: str
+    fingerprint: str
+
+
+def gen_user_emails() -> collections_abc.Iterator[UserEmail]:
+    return (UserEmail(user_id=i, email=f"user{i}@example{i % 10}.org") for i in range(SIZE))
+
+
+def validate_user_email(user_email: UserEmail) -> ValidatedUserEmail:
+    local, _, domain = user_email.email.partition("@")
+    if not local or "." not in domain:
+        raise ValueError(user_email)
+    fingerprint = user_email.email.encode()
+    for _ in range(HASH_ROUNDS):
+        fingerprint = hashlib.sha256(fingerprint).digest()
+    return ValidatedUserEmail(
+        user_id=user_email.user_id,
+        email=user_email.email,
+        domain=domain,
+        fingerprint=fingerprint.hex(),
+    )
+
+
+def validate_user_emails(user_emails: collections_abc.Iterable[UserEmail]) -> list[ValidatedUserEmail]:
+    return [validate_user_email(user_email) for user_email in user_emails]
+
+
+@profiler_utils.profile
+def run_through_iterable(items: collections_abc.Iterable[ValidatedUserEmail]) -> None:
+    for _ in items:
+        ...
+
+
+def run_serial() -> None:
+    print("serial map")
+    run_through_iterable(map(validate_user_email, gen_user_emails()))
+    print("-" * 100)
+
+
+def run_process_map(max_workers: int, chunk_size: int = CHUNK_SIZE, ordered: bool = True) -> None:
+    print(f"process_map: workers={max_workers}, chunk_size={chunk_size}, ordered={ordered}")
+    run_through_iterable(
+        pipeline_utils.process_map(
+            validate_user_emails,
+            gen_user_emails(),
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            ordered=ordered,
+            per_chunk=True,
+        )
+    )
+    print("-" * 100)
+
+
+def run() -> None:
+    run_serial()
+    run_process_map(max_workers=1, chunk_size=1)
+    workers_count = 1
+    while workers_count <= (os.cpu_count() or 1):
+        run_process_map(max_workers=workers_count)
+        workers_count *= 2
+    run_process_map(max_workers=os.cpu_count() or 1, ordered=False)
+
+
+if __name__ == "__main__":
+    run()
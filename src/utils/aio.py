@@ -0,0 +1,154 @@
+import asyncio
+import collections.abc as collections_abc
+import typing
+
+import utils.pool as pool_utils
+
+T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+C = typing.TypeVar("C")
+
+AsyncTransform = collections_abc.Callable[
+    [collections_abc.AsyncIterable[typing.Any]], collections_abc.AsyncIterable[typing.Any]
+]
+AsyncSink = collections_abc.Callable[[collections_abc.AsyncIterable[typing.Any]], collections_abc.Awaitable[None]]
+
+_END = object()
+
+
+async def aiterate(items: collections_abc.Iterable[T]) -> collections_abc.AsyncIterator[T]:
+    for item in items:
+        yield item
+
+
+async def achunked(items: collections_abc.AsyncIterable[T], n: int) -> collections_abc.AsyncIterator[list[T]]:
+    chunk: list[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) == n:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def amap(
+    func: collections_abc.Callable[[T], R], items: collections_abc.AsyncIterable[T]
+) -> collections_abc.AsyncIterator[R]:
+    async for item in items:
+        yield func(item)
+
+
+async def afilter(
+    predicate: collections_abc.Callable[[T], bool], items: collections_abc.AsyncIterable[T]
+) -> collections_abc.AsyncIterator[T]:
+    async for item in items:
+        if predicate(item):
+            yield item
+
+
+async def _put_items(
+    items: collections_abc.AsyncIterable[typing.Any], output_queue: asyncio.Queue[typing.Any], chunk_size: int
+) -> None:
+    async for chunk in achunked(items, chunk_size):
+        await output_queue.put(chunk)
+    await output_queue.put(_END)
+
+
+async def _iter_items(input_queue: asyncio.Queue[typing.Any]) -> collections_abc.AsyncIterator[typing.Any]:
+    while (chunk := await input_queue.get()) is not _END:
+        for item in chunk:
+            yield item
+
+
+async def run_async_pipeline(
+    source: collections_abc.AsyncIterable[typing.Any],
+    transforms: collections_abc.Sequence[AsyncTransform],
+    sink: AsyncSink,
+    chunk_size: int = 500,
+    queue_size: int = 4,
+) -> None:
+    queues: list[asyncio.Queue[typing.Any]] = [asyncio.Queue(maxsize=queue_size) for _ in range(len(transforms) + 1)]
+    stages: list[collections_abc.Awaitable[None]] = [_put_items(source, queues[0], chunk_size)]
+    for transform, input_queue, output_queue in zip(transforms, queues, queues[1:]):
+        stages.append(_put_items(transform(_iter_items(input_queue)), output_queue, chunk_size))
+    stages.append(sink(_iter_items(queues[-1])))
+
+    tasks = [asyncio.ensure_future(stage) for stage in stages]
+    sink_task = tasks[-1]
+    try:
+        pending = set(tasks)
+        while sink_task in pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                if task in done and (error := task.exception()) is not None:
+                    raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class LoaderProtocol(typing.Protocol):
+    def load_from_iterable(
+        self, items: collections_abc.Iterable[typing.Any], dataclass: typing.Type[typing.Any], table_name: str
+    ) -> None:
+        ...
+
+
+class AsyncLoader(typing.Generic[C]):
+    def __init__(
+        self,
+        pool: pool_utils.Pool[C],
+        loader_factory: collections_abc.Callable[[C, int], LoaderProtocol],
+        chunk_size: int,
+        concurrency: int = 1,
+    ):
+        self.pool = pool
+        self.loader_factory = loader_factory
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+
+    def _load_chunk(self, chunk: list[typing.Any], dataclass: typing.Type[typing.Any], table_name: str) -> None:
+        with self.pool.connection() as connection:
+            self.loader_factory(connection, self.chunk_size).load_from_iterable(chunk, dataclass, table_name)
+
+    async def load_from_async_iterable(
+        self,
+        items: collections_abc.AsyncIterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task[None]] = set()
+
+        async def load_chunk(chunk: list[T]) -> None:
+            try:
+                await asyncio.to_thread(self._load_chunk, chunk, dataclass, table_name)
+            finally:
+                semaphore.release()
+
+        try:
+            async for chunk in achunked(items, self.chunk_size):
+                await semaphore.acquire()
+                for task in [task for task in tasks if task.done()]:
+                    tasks.discard(task)
+                    task.result()
+                tasks.add(asyncio.ensure_future(load_chunk(chunk)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+__all__ = [
+    "aiterate",
+    "achunked",
+    "amap",
+    "afilter",
+    "run_async_pipeline",
+    "AsyncTransform",
+    "AsyncSink",
+    "AsyncLoader",
+]
@@ -0,0 +1,46 @@
+import collections.abc as collections_abc
+import math
+
+DEFAULT_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits_count = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes_count = max(1, round(self.bits_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bits_count + 7) // 8)
+        self.count = 0
+
+    def _hashes(self, value: bytes) -> tuple[int, int]:
+        value_hash = hash(value)
+        return value_hash & 0xFFFFFFFF, (value_hash >> 32) | 1
+
+    def add(self, value: bytes) -> None:
+        first, second = self._hashes(value)
+        bits, bits_count = self._bits, self.bits_count
+        for i in range(self.hashes_count):
+            index = (first + i * second) % bits_count
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def update(self, values: collections_abc.Iterable[bytes]) -> None:
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value: bytes) -> bool:
+        first, second = self._hashes(value)
+        bits, bits_count = self._bits, self.bits_count
+        for i in range(self.hashes_count):
+            index = (first + i * second) % bits_count
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+
+__all__ = [
+    "BloomFilter",
+]
@@ -0,0 +1,184 @@
+import collections.abc as collections_abc
+import dataclasses
+import datetime
+import decimal
+import hashlib
+import struct
+import typing
+import uuid
+
+import more_itertools
+
+import utils.bloom as bloom_utils
+import utils.rows as rows_utils
+
+T = typing.TypeVar("T")
+
+CHUNK_SIZE = 500
+MIN_CAPACITY = 100_000
+HASH_SIZE = 16
+
+_LENGTH = struct.Struct("<I")
+_FLOAT = struct.Struct("<d")
+
+
+def _encode_data(tag: bytes, data: bytes) -> bytes:
+    return tag + _LENGTH.pack(len(data)) + data
+
+
+def _encode_sequence(values: collections_abc.Sequence[typing.Any]) -> bytes:
+    return b"l" + _LENGTH.pack(len(values)) + b"".join(map(_encode_value, values))
+
+
+def _encode_mapping(mapping: collections_abc.Mapping[typing.Any, typing.Any]) -> bytes:
+    items = sorted(_encode_value(key) + _encode_value(value) for key, value in mapping.items())
+    return b"m" + _LENGTH.pack(len(items)) + b"".join(items)
+
+
+def _encode_set(values: collections_abc.Set[typing.Any]) -> bytes:
+    return b"e" + _LENGTH.pack(len(values)) + b"".join(sorted(map(_encode_value, values)))
+
+
+_ENCODERS: dict[type, collections_abc.Callable[[typing.Any], bytes]] = {
+    type(None): lambda value: b"N",
+    bool: lambda value: b"T" if value else b"F",
+    int: lambda value: _encode_data(b"i", str(int(value)).encode()),
+    float: lambda value: b"f" + _FLOAT.pack(value),
+    str: lambda value: _encode_data(b"s", str(value).encode()),
+    bytes: lambda value: _encode_data(b"b", bytes(value)),
+    bytearray: lambda value: _encode_data(b"b", bytes(value)),
+    memoryview: lambda value: _encode_data(b"b", bytes(value)),
+    decimal.Decimal: lambda value: _encode_data(b"d", str(value).encode()),
+    datetime.datetime: lambda value: _encode_data(b"t", value.isoformat().encode()),
+    datetime.date: lambda value: _encode_data(b"D", value.isoformat().encode()),
+    datetime.time: lambda value: _encode_data(b"h", value.isoformat().encode()),
+    uuid.UUID: lambda value: b"u" + value.bytes,
+    tuple: _encode_sequence,
+    list: _encode_sequence,
+    dict: _encode_mapping,
+    set: _encode_set,
+    frozenset: _encode_set,
+}
+
+
+def _encode_value(value: typing.Any) -> bytes:
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        encoder = rows_utils.find_by_mro(_ENCODERS, type(value))
+    return encoder(value)
+
+
+def encode_values(values: tuple[typing.Any, ...]) -> bytes:
+    return b"".join(map(_encode_value, values))
+
+
+def fingerprint(values: tuple[typing.Any, ...]) -> bytes:
+    return hashlib.blake2b(encode_values(values), digest_size=HASH_SIZE).digest()
+
+
+@dataclasses.dataclass
+class ChangeStats:
+    rows: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    lookups: int = 0
+
+
+class HashStore(typing.Protocol):
+    def __len__(self) -> int:
+        ...
+
+    def keys(self) -> collections_abc.Iterator[bytes]:
+        ...
+
+    def get_many(self, keys: collections_abc.Iterable[bytes]) -> dict[bytes, bytes]:
+        ...
+
+    def put_many(self, hashes: collections_abc.Iterable[tuple[bytes, bytes]], commit: bool = True) -> None:
+        ...
+
+
+class ChangeDetector:
+    def __init__(
+        self,
+        index: HashStore,
+        dataclass: type,
+        key: collections_abc.Sequence[str],
+        chunk_size: int = CHUNK_SIZE,
+        error_rate: float = bloom_utils.DEFAULT_ERROR_RATE,
+    ):
+        field_names = rows_utils.get_field_names(dataclass)
+        if not key or any(column not in field_names for column in key):
+            raise ValueError
+        self.index = index
+        self.chunk_size = chunk_size
+        self.error_rate = error_rate
+        self.stats = ChangeStats()
+        self._key_getter = rows_utils.make_getter(tuple(key))
+        self._row_getter = rows_utils.make_getter(field_names)
+        self._pending: dict[bytes, bytes] = {}
+        self._saved: dict[bytes, bytes] = {}
+        self._bloom: typing.Optional[bloom_utils.BloomFilter] = None
+
+    @property
+    def bloom(self) -> bloom_utils.BloomFilter:
+        if self._bloom is None:
+            indexed_count = len(self.index)
+            self._bloom = bloom_utils.BloomFilter(max(MIN_CAPACITY, 2 * indexed_count), self.error_rate)
+            if indexed_count:
+                self._bloom.update(self.index.keys())
+        return self._bloom
+
+    def filter_changed(self, items: collections_abc.Iterable[T]) -> collections_abc.Iterator[T]:
+        bloom = self.bloom
+        for chunk in more_itertools.chunked(items, self.chunk_size):
+            self._saved.clear()
+            keys = [encode_values(self._key_getter(item)) for item in chunk]
+            hashes = [fingerprint(self._row_getter(item)) for item in chunk]
+            maybe_known = [key for key in keys if key in bloom]
+            self.stats.lookups += len(maybe_known)
+            known = self.index.get_many(maybe_known) if maybe_known else {}
+
+            for item, key, row_hash in zip(chunk, keys, hashes):
+                self.stats.rows += 1
+                previous = self._pending.get(key) or self._saved.get(key) or known.get(key)
+                if previous == row_hash:
+                    self.stats.unchanged += 1
+                    continue
+                if previous is None:
+                    self.stats.new += 1
+                else:
+                    self.stats.changed += 1
+                self._pending[key] = row_hash
+                yield item
+
+    def _flush(self, hashes: dict[bytes, bytes], commit: bool) -> None:
+        self.index.put_many(hashes.items(), commit=commit)
+        self.bloom.update(hashes)
+        self._saved.update(hashes)
+
+    def save_chunk(self, chunk: collections_abc.Iterable[typing.Any], commit: bool = False) -> None:
+        hashes = {}
+        for item in chunk:
+            key = encode_values(self._key_getter(item))
+            row_hash = self._pending.pop(key, None)
+            if row_hash is not None:
+                hashes[key] = row_hash
+        self._flush(hashes, commit)
+
+    def save(self, commit: bool = True) -> None:
+        self._flush(self._pending, commit)
+        self._pending.clear()
+
+    def discard(self) -> None:
+        self._pending.clear()
+
+
+__all__ = [
+    "encode_values",
+    "fingerprint",
+    "ChangeDetector",
+    "ChangeStats",
+    "HashStore",
+]
@@ -0,0 +1,158 @@
+import collections
+import collections.abc as collections_abc
+import dataclasses
+import itertools
+import typing
+
+T = typing.TypeVar("T")
+
+MIN_CHUNK_SIZE = 10
+MAX_CHUNK_SIZE = 50_000
+MAX_GROWTH = 2.0
+SMOOTHING = 0.5
+HISTORY_SIZE = 1000
+SAMPLE_SIZE = 16
+DEFAULT_VALUE_SIZE = 8
+
+
+@dataclasses.dataclass
+class ChunkStats:
+    chunks: int = 0
+    rows: int = 0
+    total_time: float = 0.0
+    total_bytes: int = 0
+    min_chunk_size: typing.Optional[int] = None
+    max_chunk_size: typing.Optional[int] = None
+    chunk_sizes: collections.deque[int] = dataclasses.field(
+        default_factory=lambda: collections.deque(maxlen=HISTORY_SIZE)
+    )
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.total_time if self.total_time else 0.0
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "chunks": self.chunks,
+            "rows": self.rows,
+            "total_time": self.total_time,
+            "total_bytes": self.total_bytes,
+            "rows_per_sec": self.rows_per_sec,
+            "min_chunk_size": self.min_chunk_size,
+            "max_chunk_size": self.max_chunk_size,
+            "chunk_sizes": list(self.chunk_sizes),
+        }
+
+
+def _value_size(value: typing.Any) -> int:
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return len(value)
+    return DEFAULT_VALUE_SIZE
+
+
+def estimate_size(rows: collections_abc.Sequence[collections_abc.Sequence[typing.Any]]) -> int:
+    if not rows:
+        return 0
+    sample = rows[:: max(1, len(rows) // SAMPLE_SIZE)]
+    sample_size = sum(_value_size(value) for row in sample for value in row)
+    return sample_size * len(rows) // len(sample)
+
+
+class ChunkSizer:
+    def __init__(self, chunk_size: int):
+        if chunk_size < 1:
+            raise ValueError
+        self._chunk_size = chunk_size
+        self.stats = ChunkStats()
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    def chunked(self, items: collections_abc.Iterable[T]) -> collections_abc.Iterator[list[T]]:
+        iterator = iter(items)
+        while chunk := list(itertools.islice(iterator, self.chunk_size)):
+            yield chunk
+
+    def ichunked(self, items: collections_abc.Iterable[T]) -> collections_abc.Iterator[collections_abc.Iterator[T]]:
+        iterator = iter(items)
+        for first in iterator:
+            yield itertools.chain((first,), itertools.islice(iterator, self.chunk_size - 1))
+
+    def record(self, rows_count: int, elapsed_time: float, bytes_count: int = 0) -> None:
+        stats = self.stats
+        stats.chunks += 1
+        stats.rows += rows_count
+        stats.total_time += elapsed_time
+        stats.total_bytes += bytes_count
+        stats.chunk_sizes.append(rows_count)
+        stats.min_chunk_size = rows_count if stats.min_chunk_size is None else min(stats.min_chunk_size, rows_count)
+        stats.max_chunk_size = rows_count if stats.max_chunk_size is None else max(stats.max_chunk_size, rows_count)
+
+
+class AdaptiveChunkSizer(ChunkSizer):
+    def __init__(
+        self,
+        chunk_size: int,
+        min_size: int = MIN_CHUNK_SIZE,
+        max_size: int = MAX_CHUNK_SIZE,
+        target_time: typing.Optional[float] = None,
+        target_bytes: typing.Optional[int] = None,
+        smoothing: float = SMOOTHING,
+        max_growth: float = MAX_GROWTH,
+    ):
+        if not 1 <= min_size <= chunk_size <= max_size:
+            raise ValueError
+        if target_time is None and target_bytes is None:
+            raise ValueError
+        if not 0 < smoothing <= 1 or max_growth <= 1:
+            raise ValueError
+        super().__init__(chunk_size)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_time = target_time
+        self.target_bytes = target_bytes
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self._time_per_row: typing.Optional[float] = None
+        self._bytes_per_row: typing.Optional[float] = None
+
+    def _smooth(self, previous: typing.Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return previous + self.smoothing * (value - previous)
+
+    def record(self, rows_count: int, elapsed_time: float, bytes_count: int = 0) -> None:
+        super().record(rows_count, elapsed_time, bytes_count)
+        if not rows_count:
+            return
+
+        self._time_per_row = self._smooth(self._time_per_row, elapsed_time / rows_count)
+        self._bytes_per_row = self._smooth(self._bytes_per_row, bytes_count / rows_count)
+
+        candidates = []
+        if self.target_time is not None and self._time_per_row > 0:
+            candidates.append(self.target_time / self._time_per_row)
+        if self.target_bytes is not None and self._bytes_per_row > 0:
+            candidates.append(self.target_bytes / self._bytes_per_row)
+        if not candidates:
+            return
+
+        chunk_size = min(candidates)
+        chunk_size = min(max(chunk_size, self._chunk_size / self.max_growth), self._chunk_size * self.max_growth)
+        self._chunk_size = int(min(max(chunk_size, self.min_size), self.max_size))
+
+
+def make_sizer(chunk_size: typing.Union[int, ChunkSizer]) -> ChunkSizer:
+    if isinstance(chunk_size, ChunkSizer):
+        return chunk_size
+    return ChunkSizer(chunk_size)
+
+
+__all__ = [
+    "ChunkSizer",
+    "AdaptiveChunkSizer",
+    "ChunkStats",
+    "estimate_size",
+    "make_sizer",
+]
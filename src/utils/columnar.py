@@ -0,0 +1,176 @@
+import array
+import collections.abc as collections_abc
+import itertools
+import operator
+import typing
+
+import more_itertools
+
+import utils.rows as rows_utils
+
+T = typing.TypeVar("T")
+
+Column = typing.Union[array.array, list[typing.Any]]  # type: ignore[type-arg]
+
+COMPARISONS: dict[str, collections_abc.Callable[[typing.Any, typing.Any], typing.Any]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "&": operator.and_,
+    "|": operator.or_,
+}
+ARITHMETIC: dict[str, collections_abc.Callable[[typing.Any, typing.Any], typing.Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "//": operator.floordiv,
+    "%": operator.mod,
+}
+
+
+def _make_column(values: collections_abc.Iterable[typing.Any], typecode: typing.Optional[str]) -> Column:
+    values = values if isinstance(values, list) else list(values)
+    if typecode is None:
+        return values
+    return array.array(typecode, values)
+
+
+def _typecode(column: Column) -> typing.Optional[str]:
+    return column.typecode if isinstance(column, array.array) else None
+
+
+def _operands(column: Column, value: typing.Any) -> collections_abc.Iterable[typing.Any]:
+    if isinstance(value, (array.array, list)):
+        if len(value) != len(column):
+            raise ValueError
+        return value
+    return itertools.repeat(value, len(column))
+
+
+def compare(column: Column, op: str, value: typing.Any) -> list[bool]:
+    return list(map(COMPARISONS[op], column, _operands(column, value)))
+
+
+def compute(column: Column, op: str, value: typing.Any) -> Column:
+    return _make_column(map(ARITHMETIC[op], column, _operands(column, value)), _typecode(column))
+
+
+def invert(mask: collections_abc.Iterable[typing.Any]) -> list[bool]:
+    return list(map(operator.not_, mask))
+
+
+class ColumnarBatch:
+    def __init__(self, columns: dict[str, Column]):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_tuples(
+        cls,
+        column_names: collections_abc.Sequence[str],
+        rows: collections_abc.Sequence[tuple[typing.Any, ...]],
+        typecodes: typing.Optional[collections_abc.Mapping[str, str]] = None,
+    ) -> "ColumnarBatch":
+        typecodes = typecodes or {}
+        values_by_column: collections_abc.Iterable[tuple[typing.Any, ...]] = (
+            zip(*rows) if rows else ((),) * len(column_names)
+        )
+        return cls(
+            {
+                name: _make_column(values, typecodes.get(name))
+                for name, values in zip(column_names, values_by_column, strict=True)
+            }
+        )
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: collections_abc.Iterable[typing.Any],
+        target: type,
+        typecodes: typing.Optional[collections_abc.Mapping[str, str]] = None,
+    ) -> "ColumnarBatch":
+        field_names = rows_utils.get_field_names(target)
+        getter = rows_utils.make_getter(field_names)
+        return cls.from_tuples(field_names, [getter(row) for row in rows], typecodes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    @property
+    def column_names(self) -> tuple[str, ...]:
+        return tuple(self.columns)
+
+    def to_tuples(self) -> collections_abc.Iterator[tuple[typing.Any, ...]]:
+        return zip(*self.columns.values())
+
+    def to_rows(self, target: typing.Type[T]) -> collections_abc.Iterator[T]:
+        return rows_utils.make_row_mapper(target, self.column_names)(self.to_tuples())
+
+    def compress(self, mask: collections_abc.Iterable[typing.Any]) -> "ColumnarBatch":
+        mask = mask if isinstance(mask, collections_abc.Sequence) else list(mask)
+        return ColumnarBatch(
+            {
+                name: _make_column(itertools.compress(column, mask), _typecode(column))
+                for name, column in self.columns.items()
+            }
+        )
+
+    def filter(self, name: str, predicate: collections_abc.Callable[[typing.Any], bool]) -> "ColumnarBatch":
+        return self.compress(list(map(predicate, self.columns[name])))
+
+    def where(self, name: str, op: str, value: typing.Any) -> "ColumnarBatch":
+        return self.compress(compare(self.columns[name], op, value))
+
+    def project(self, *names: str) -> "ColumnarBatch":
+        return ColumnarBatch({name: self.columns[name] for name in names})
+
+    def with_column(self, name: str, column: Column) -> "ColumnarBatch":
+        return ColumnarBatch({**self.columns, name: column})
+
+    def map(
+        self,
+        name: str,
+        func: collections_abc.Callable[[typing.Any], typing.Any],
+        output_name: typing.Optional[str] = None,
+        typecode: typing.Optional[str] = None,
+    ) -> "ColumnarBatch":
+        return self.with_column(output_name or name, _make_column(map(func, self.columns[name]), typecode))
+
+
+def to_batches(
+    rows: collections_abc.Iterable[typing.Any],
+    target: type,
+    batch_size: int,
+    typecodes: typing.Optional[collections_abc.Mapping[str, str]] = None,
+) -> collections_abc.Iterator[ColumnarBatch]:
+    for chunk in more_itertools.chunked(rows, batch_size):
+        yield ColumnarBatch.from_rows(chunk, target, typecodes)
+
+
+def from_batches(
+    batches: collections_abc.Iterable[ColumnarBatch], target: typing.Type[T]
+) -> collections_abc.Iterator[T]:
+    for batch in batches:
+        yield from batch.to_rows(target)
+
+
+__all__ = [
+    "ColumnarBatch",
+    "Column",
+    "COMPARISONS",
+    "ARITHMETIC",
+    "compare",
+    "compute",
+    "invert",
+    "to_batches",
+    "from_batches",
+]
@@ -0,0 +1,112 @@
+import collections.abc as collections_abc
+import typing
+
+import more_itertools
+
+MAP = "map"
+FILTER = "filter"
+FLAT_MAP = "flat_map"
+
+INDENT = "    "
+
+
+Func = typing.Union[collections_abc.Callable[[typing.Any], typing.Any], str]
+
+
+class Step(typing.NamedTuple):
+    kind: str
+    func: Func
+
+
+def _render_call(step: Step, index: int) -> str:
+    if isinstance(step.func, str):
+        return f"({step.func})"
+    return f"func_{index}(item)"
+
+
+def _render_steps(steps: collections_abc.Sequence[Step], emit: str) -> list[str]:
+    lines = ["for item in items:"]
+    depth = 1
+    for index, step in enumerate(steps):
+        call = _render_call(step, index)
+        if step.kind == MAP:
+            lines.append(f"{INDENT * depth}item = {call}")
+        elif step.kind == FILTER:
+            lines.append(f"{INDENT * depth}if not {call}:")
+            lines.append(f"{INDENT * (depth + 1)}continue")
+        elif step.kind == FLAT_MAP:
+            lines.append(f"{INDENT * depth}for item in {call}:")
+            depth += 1
+        else:
+            raise ValueError
+    lines.append(f"{INDENT * depth}{emit}")
+    return lines
+
+
+def _compile(
+    steps: collections_abc.Sequence[Step], name: str, header: list[str], emit: str, footer: list[str]
+) -> collections_abc.Callable[..., typing.Any]:
+    funcs = {f"func_{index}": step.func for index, step in enumerate(steps) if not isinstance(step.func, str)}
+    arguments = "".join(f", {func_name}={func_name}" for func_name in funcs)
+    body = [*header, *_render_steps(steps, emit), *footer]
+    source = f"def {name}(items{arguments}):\n" + "".join(f"{INDENT}{line}\n" for line in body)
+    namespace: dict[str, typing.Any] = dict(funcs)
+    exec(compile(source, f"<fused {name}>", "exec"), namespace)
+    return typing.cast(collections_abc.Callable[..., typing.Any], namespace[name])
+
+
+class Chain:
+    def __init__(self, steps: collections_abc.Sequence[Step] = ()):
+        self.steps = tuple(steps)
+        self._fused: typing.Optional[collections_abc.Callable[..., collections_abc.Iterator[typing.Any]]] = None
+        self._fused_batch: typing.Optional[collections_abc.Callable[..., list[typing.Any]]] = None
+
+    def _then(self, kind: str, func: Func) -> "Chain":
+        if isinstance(func, str):
+            compile(func, "<step>", "eval")
+        return Chain([*self.steps, Step(kind, func)])
+
+    def map(self, func: Func) -> "Chain":
+        return self._then(MAP, func)
+
+    def filter(self, predicate: Func) -> "Chain":
+        return self._then(FILTER, predicate)
+
+    def flat_map(self, func: Func) -> "Chain":
+        return self._then(FLAT_MAP, func)
+
+    def then(self, other: "Chain") -> "Chain":
+        return Chain([*self.steps, *other.steps])
+
+    @property
+    def source(self) -> str:
+        return "\n".join(_render_steps(self.steps, "yield item"))
+
+    def __call__(self, items: collections_abc.Iterable[typing.Any]) -> collections_abc.Iterator[typing.Any]:
+        if self._fused is None:
+            self._fused = _compile(self.steps, "fused", [], "yield item", [])
+        return self._fused(items)
+
+    def apply_batch(self, items: collections_abc.Iterable[typing.Any]) -> list[typing.Any]:
+        if self._fused_batch is None:
+            self._fused_batch = _compile(
+                self.steps,
+                "fused_batch",
+                ["result = []", "append = result.append"],
+                "append(item)",
+                ["return result"],
+            )
+        return self._fused_batch(items)
+
+    def run_batches(
+        self, items: collections_abc.Iterable[typing.Any], chunk_size: int
+    ) -> collections_abc.Iterator[list[typing.Any]]:
+        for chunk in more_itertools.chunked(items, chunk_size):
+            yield self.apply_batch(chunk)
+
+
+__all__ = [
+    "Chain",
+    "Step",
+    "Func",
+]
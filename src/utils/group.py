@@ -0,0 +1,76 @@
+import collections.abc as collections_abc
+import itertools
+import tempfile
+import typing
+
+import utils.spill as spill_utils
+
+T = typing.TypeVar("T")
+K = typing.TypeVar("K")
+A = typing.TypeVar("A")
+
+MAX_GROUPS = 100_000
+PARTITIONS_COUNT = 16
+MAX_DEPTH = 8
+
+
+def pack_by(
+    items: collections_abc.Iterable[T],
+    key: collections_abc.Callable[[T], K],
+    factory: collections_abc.Callable[[K], A],
+    accumulate: collections_abc.Callable[[A, T], A],
+    grouped: bool = True,
+    max_groups: int = MAX_GROUPS,
+    partitions_count: int = PARTITIONS_COUNT,
+    directory: typing.Optional[str] = None,
+) -> collections_abc.Iterator[A]:
+    if grouped:
+        for group_key, group in itertools.groupby(items, key=key):
+            accumulator = factory(group_key)
+            for item in group:
+                accumulator = accumulate(accumulator, item)
+            yield accumulator
+        return
+
+    with tempfile.TemporaryDirectory(dir=directory) as spill_directory:
+        yield from _hash_pack(items, key, factory, accumulate, max_groups, partitions_count, spill_directory, 0)
+
+
+def _hash_pack(
+    items: collections_abc.Iterable[T],
+    key: collections_abc.Callable[[T], K],
+    factory: collections_abc.Callable[[K], A],
+    accumulate: collections_abc.Callable[[A, T], A],
+    max_groups: int,
+    partitions_count: int,
+    directory: str,
+    depth: int,
+) -> collections_abc.Iterator[A]:
+    accumulators: dict[K, A] = {}
+    partitions: typing.Optional[list[spill_utils.SpillFile]] = None
+    for item in items:
+        item_key = key(item)
+        if item_key in accumulators:
+            accumulators[item_key] = accumulate(accumulators[item_key], item)
+        elif len(accumulators) < max_groups or depth >= MAX_DEPTH:
+            accumulators[item_key] = accumulate(factory(item_key), item)
+        else:
+            if partitions is None:
+                partitions = [spill_utils.SpillFile(directory) for _ in range(partitions_count)]
+            partitions[hash((depth, item_key)) % partitions_count].write(item)
+
+    yield from accumulators.values()
+    accumulators.clear()
+
+    for partition in partitions or []:
+        if not partition.count:
+            partition.close()
+            continue
+        yield from _hash_pack(
+            partition.read(), key, factory, accumulate, max_groups, partitions_count, directory, depth + 1
+        )
+
+
+__all__ = [
+    "pack_by",
+]
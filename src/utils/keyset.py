@@ -0,0 +1,98 @@
+import collections.abc as collections_abc
+import dataclasses
+import time
+import typing
+
+import utils.chunking as chunking_utils
+
+Rows = list[tuple[typing.Any, ...]]
+Execute = collections_abc.Callable[[str, tuple[typing.Any, ...]], Rows]
+
+
+def _build_where(conditions: collections_abc.Sequence[str]) -> str:
+    if not conditions:
+        return ""
+    return f" WHERE {' AND '.join(conditions)}"
+
+
+@dataclasses.dataclass
+class KeysetQuery:
+    columns: tuple[str, ...]
+    fields_count: int
+    key_indexes: list[int]
+    range_data: list[typing.Any]
+    first_page_stmt: str
+    next_page_stmt: str
+
+
+def build_query(
+    field_names: collections_abc.Sequence[str],
+    table_name: str,
+    key: collections_abc.Sequence[str],
+    placeholder: str,
+    lower: typing.Any = None,
+    upper: typing.Any = None,
+) -> KeysetQuery:
+    if not key:
+        raise ValueError
+    columns = (*field_names, *(column for column in key if column not in field_names))
+
+    range_conditions: list[str] = []
+    range_data: list[typing.Any] = []
+    if lower is not None:
+        range_conditions.append(f"{key[0]} >= {placeholder}")
+        range_data.append(lower)
+    if upper is not None:
+        range_conditions.append(f"{key[0]} < {placeholder}")
+        range_data.append(upper)
+
+    select_stmt = f"SELECT {', '.join(columns)} FROM {table_name}"
+    order_stmt = f" ORDER BY {', '.join(key)} LIMIT {placeholder}"
+    next_page_condition = f"({', '.join(key)}) > ({', '.join(placeholder for _ in key)})"
+    return KeysetQuery(
+        columns=columns,
+        fields_count=len(field_names),
+        key_indexes=[columns.index(column) for column in key],
+        range_data=range_data,
+        first_page_stmt=select_stmt + _build_where(range_conditions) + order_stmt,
+        next_page_stmt=select_stmt + _build_where([*range_conditions, next_page_condition]) + order_stmt,
+    )
+
+
+def iter_pages(
+    execute: Execute,
+    query: KeysetQuery,
+    sizer: chunking_utils.ChunkSizer,
+    after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+) -> collections_abc.Iterator[Rows]:
+    if after is not None and len(after) != len(query.key_indexes):
+        raise ValueError
+    last_key = None if after is None else list(after)
+    while True:
+        chunk_size = sizer.chunk_size
+        start = time.perf_counter()
+        if last_key is None:
+            rows = execute(query.first_page_stmt, (*query.range_data, chunk_size + 1))
+        else:
+            rows = execute(query.next_page_stmt, (*query.range_data, *last_key, chunk_size + 1))
+        sizer.record(len(rows), time.perf_counter() - start, chunking_utils.estimate_size(rows))
+        if not rows:
+            break
+        has_more = len(rows) > chunk_size
+        if has_more:
+            if all(rows[chunk_size][index] == rows[chunk_size - 1][index] for index in query.key_indexes):
+                raise ValueError("keyset key is not unique")
+            rows = rows[:chunk_size]
+        last_key = [rows[-1][index] for index in query.key_indexes]
+        if len(query.columns) > query.fields_count:
+            rows = [row[: query.fields_count] for row in rows]
+        yield rows
+        if not has_more:
+            break
+
+
+__all__ = [
+    "KeysetQuery",
+    "build_query",
+    "iter_pages",
+]
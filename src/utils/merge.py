@@ -0,0 +1,45 @@
+import collections.abc as collections_abc
+import functools
+import heapq
+import itertools
+import operator
+import typing
+
+T = typing.TypeVar("T")
+
+
+def _combine_across_streams(
+    group: collections_abc.Iterable[tuple[int, T]], combine: collections_abc.Callable[[T, T], T]
+) -> collections_abc.Iterator[T]:
+    occurrences: list[list[T]] = []
+    counts: dict[int, int] = {}
+    for index, item in group:
+        occurrence = counts.get(index, 0)
+        counts[index] = occurrence + 1
+        if occurrence == len(occurrences):
+            occurrences.append([])
+        occurrences[occurrence].append(item)
+    return (functools.reduce(combine, items) for items in occurrences)
+
+
+def merge_sorted(
+    *iterators: collections_abc.Iterable[T],
+    key: typing.Optional[collections_abc.Callable[[T], typing.Any]] = None,
+    combine: typing.Optional[collections_abc.Callable[[T, T], T]] = None,
+) -> collections_abc.Iterator[T]:
+    if combine is None:
+        merged: collections_abc.Iterator[T] = heapq.merge(*iterators, key=key)  # type: ignore[arg-type]
+        return merged
+
+    tagged_key = operator.itemgetter(1) if key is None else lambda tagged: key(tagged[1])
+    tagged = heapq.merge(
+        *(zip(itertools.repeat(index), iterator) for index, iterator in enumerate(iterators)), key=tagged_key
+    )
+    return itertools.chain.from_iterable(
+        _combine_across_streams(group, combine) for _, group in itertools.groupby(tagged, key=tagged_key)
+    )
+
+
+__all__ = [
+    "merge_sorted",
+]
@@ -0,0 +1,157 @@
+import collections
+import collections.abc as collections_abc
+import concurrent.futures
+import contextlib
+import functools
+import os
+import queue
+import threading
+import typing
+
+import more_itertools
+
+Transform = collections_abc.Callable[[collections_abc.Iterable[typing.Any]], collections_abc.Iterable[typing.Any]]
+Sink = collections_abc.Callable[[collections_abc.Iterable[typing.Any]], None]
+
+POLL_TIMEOUT = 0.1
+
+_END = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+class _Channel:
+    def __init__(self, maxsize: int, stop: threading.Event):
+        self._queue: queue.Queue[typing.Any] = queue.Queue(maxsize=maxsize)
+        self._stop = stop
+
+    def put(self, item: typing.Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                self._queue.put(item, timeout=POLL_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def get(self) -> typing.Any:
+        while True:
+            if self._stop.is_set():
+                raise _Stopped
+            try:
+                return self._queue.get(timeout=POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+
+    def put_items(self, items: collections_abc.Iterable[typing.Any], chunk_size: int) -> None:
+        for chunk in more_itertools.chunked(items, chunk_size):
+            self.put(chunk)
+        self.put(_END)
+
+    def iter_items(self) -> collections_abc.Iterator[typing.Any]:
+        while (chunk := self.get()) is not _END:
+            yield from chunk
+
+
+def _run_transform(transform: Transform, input_channel: _Channel, output_channel: _Channel, chunk_size: int) -> None:
+    output_channel.put_items(transform(input_channel.iter_items()), chunk_size)
+
+
+def run_pipeline(
+    source: collections_abc.Iterable[typing.Any],
+    transforms: collections_abc.Sequence[Transform],
+    sink: Sink,
+    chunk_size: int = 500,
+    queue_size: int = 4,
+) -> None:
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    channels = [_Channel(queue_size, stop) for _ in range(len(transforms) + 1)]
+
+    def run_stage(stage: collections_abc.Callable[[], None]) -> None:
+        try:
+            stage()
+        except _Stopped:
+            pass
+        except BaseException as error:
+            errors.append(error)
+            stop.set()
+
+    stages = [functools.partial(channels[0].put_items, source, chunk_size)]
+    for transform, input_channel, output_channel in zip(transforms, channels, channels[1:]):
+        stages.append(functools.partial(_run_transform, transform, input_channel, output_channel, chunk_size))
+    threads = [threading.Thread(target=run_stage, args=(stage,), daemon=True) for stage in stages]
+
+    for thread in threads:
+        thread.start()
+    try:
+        sink(channels[-1].iter_items())
+    except _Stopped:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+
+
+def _map_chunk(func: collections_abc.Callable[[typing.Any], typing.Any], chunk: list[typing.Any]) -> list[typing.Any]:
+    return [func(item) for item in chunk]
+
+
+def _apply_to_chunk(transform: Transform, chunk: list[typing.Any]) -> list[typing.Any]:
+    return list(transform(chunk))
+
+
+def process_map(
+    func: collections_abc.Callable[[typing.Any], typing.Any],
+    items: collections_abc.Iterable[typing.Any],
+    chunk_size: int = 500,
+    max_workers: typing.Optional[int] = None,
+    window: typing.Optional[int] = None,
+    ordered: bool = True,
+    per_chunk: bool = False,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> collections_abc.Iterator[typing.Any]:
+    task = _apply_to_chunk if per_chunk else _map_chunk
+    with contextlib.ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=max_workers))
+        if window is None:
+            window = 2 * (max_workers or os.cpu_count() or 1)
+
+        in_flight: collections.deque[concurrent.futures.Future[list[typing.Any]]] = collections.deque()
+        try:
+            for chunk in more_itertools.chunked(items, chunk_size):
+                if len(in_flight) >= window:
+                    yield from _pop_done(in_flight, ordered)
+                in_flight.append(executor.submit(task, func, chunk))
+            while in_flight:
+                yield from _pop_done(in_flight, ordered)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def _pop_done(
+    in_flight: collections.deque[concurrent.futures.Future[list[typing.Any]]], ordered: bool
+) -> list[typing.Any]:
+    if ordered:
+        return in_flight.popleft().result()
+    done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+    future = next(iter(done))
+    in_flight.remove(future)
+    return future.result()
+
+
+__all__ = [
+    "run_pipeline",
+    "process_map",
+    "Transform",
+    "Sink",
+]
@@ -0,0 +1,202 @@
+import collections
+import collections.abc as collections_abc
+import contextlib
+import dataclasses
+import threading
+import time
+import typing
+
+C = typing.TypeVar("C")
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class PoolClosedError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class PoolStats:
+    created: int = 0
+    closed: int = 0
+    checkouts: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    failed_checks: int = 0
+    evicted: int = 0
+
+
+class Pool(typing.Generic[C]):
+    def __init__(
+        self,
+        connect: collections_abc.Callable[[], C],
+        check: collections_abc.Callable[[C], bool],
+        reset: collections_abc.Callable[[C], None],
+        close: collections_abc.Callable[[C], None],
+        min_size: int,
+        max_size: int,
+        max_idle_time: float = 600.0,
+        check_idle_time: float = 0.0,
+    ):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError
+        self._connect = connect
+        self._check = check
+        self._reset = reset
+        self._close = close
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.check_idle_time = check_idle_time
+        self.stats = PoolStats()
+
+        self._condition = threading.Condition()
+        self._idle: collections.deque[tuple[C, float]] = collections.deque()
+        self._size = 0
+        self._closed = False
+
+        try:
+            for _ in range(min_size):
+                self._idle.append((self._create(), time.monotonic()))
+        except BaseException:
+            for connection, _ in self._idle:
+                self._close_quietly(connection)
+            raise
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _create(self) -> C:
+        connection = self._connect()
+        with self._condition:
+            self._size += 1
+            self.stats.created += 1
+        return connection
+
+    def _close_quietly(self, connection: C) -> None:
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+
+    def _discard(self, connection: C) -> None:
+        with self._condition:
+            self._size -= 1
+            self.stats.closed += 1
+            self._condition.notify()
+        self._close_quietly(connection)
+
+    def _take_idle_or_slot(self, start: float, timeout: typing.Optional[float]) -> typing.Optional[tuple[C, float]]:
+        self.evict_idle()
+        waited = False
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolClosedError
+                if self._idle or self._size < self.max_size:
+                    break
+                waited = True
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError
+                self._condition.wait(remaining)
+
+            if waited:
+                wait_time = time.monotonic() - start
+                self.stats.waits += 1
+                self.stats.wait_time += wait_time
+                self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None
+
+    def evict_idle(self) -> int:
+        deadline = time.monotonic() - self.max_idle_time
+        evicted = []
+        with self._condition:
+            while self._idle and self._size > self.min_size and self._idle[0][1] < deadline:
+                connection, _ = self._idle.popleft()
+                evicted.append(connection)
+                self._size -= 1
+            self.stats.evicted += len(evicted)
+            self.stats.closed += len(evicted)
+            self._condition.notify(len(evicted))
+        for connection in evicted:
+            self._close_quietly(connection)
+        return len(evicted)
+
+    def acquire(self, timeout: typing.Optional[float] = None) -> C:
+        start = time.monotonic()
+        while True:
+            idle = self._take_idle_or_slot(start, timeout)
+            if idle is None:
+                try:
+                    connection = self._connect()
+                except BaseException:
+                    with self._condition:
+                        self._size -= 1
+                        self._condition.notify()
+                    raise
+                with self._condition:
+                    self.stats.created += 1
+                break
+            connection, idle_since = idle
+            if time.monotonic() - idle_since < self.check_idle_time or self._check(connection):
+                break
+            with self._condition:
+                self.stats.failed_checks += 1
+            self._discard(connection)
+
+        with self._condition:
+            self.stats.checkouts += 1
+        return connection
+
+    def release(self, connection: C) -> None:
+        try:
+            self._reset(connection)
+        except Exception:
+            self._discard(connection)
+            return
+        with self._condition:
+            closed = self._closed
+            if not closed:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+        if closed:
+            self._discard(connection)
+        else:
+            self.evict_idle()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: typing.Optional[float] = None) -> collections_abc.Iterator[C]:
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        for connection in idle:
+            self._discard(connection)
+
+
+__all__ = [
+    "Pool",
+    "PoolStats",
+    "PoolTimeoutError",
+    "PoolClosedError",
+]
@@ -1,19 +1,207 @@
+import collections.abc as collections_abc
+import contextlib
+import dataclasses
 import functools
+import json
+import threading
 import time
 import tracemalloc
 import typing
 
+T = typing.TypeVar("T")
+
+_tracing_lock = threading.Lock()
+_tracing_owners = 0
+
+
+@contextlib.contextmanager
+def trace_memory() -> collections_abc.Iterator[None]:
+    global _tracing_owners
+    with _tracing_lock:
+        owner = _tracing_owners > 0 or not tracemalloc.is_tracing()
+        if owner:
+            if _tracing_owners == 0:
+                tracemalloc.start()
+            _tracing_owners += 1
+    try:
+        yield
+    finally:
+        if owner:
+            with _tracing_lock:
+                _tracing_owners -= 1
+                if _tracing_owners == 0:
+                    tracemalloc.stop()
+
+
+def _traced_memory() -> tuple[int, int]:
+    return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+
+
+@dataclasses.dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    total_time: float = 0.0
+    child_time: float = 0.0
+    time_to_first_item: typing.Optional[float] = None
+    peak_memory: typing.Optional[int] = 0
+
+    @property
+    def self_time(self) -> float:
+        return self.total_time - self.child_time
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.items / self.total_time if self.total_time else 0.0
+
+    def to_dict(self) -> dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "items": self.items,
+            "total_time": self.total_time,
+            "self_time": self.self_time,
+            "items_per_sec": self.items_per_sec,
+            "time_to_first_item": self.time_to_first_item,
+            "peak_memory": self.peak_memory,
+        }
+
+
+@dataclasses.dataclass
+class _Frame:
+    stats: StageStats
+    started: float
+    base_memory: int
+    shared: bool = False
+
+
+_frames_lock = threading.Lock()
+_frames_by_thread: dict[int, list[_Frame]] = {}
+
+
+def _update_peak(frame: _Frame, peak: int) -> None:
+    if frame.shared:
+        frame.stats.peak_memory = None
+    elif frame.stats.peak_memory is not None:
+        frame.stats.peak_memory = max(frame.stats.peak_memory, peak - frame.base_memory)
+
+
+def _enter(stats: StageStats) -> _Frame:
+    with _frames_lock:
+        frames = _frames_by_thread.setdefault(threading.get_ident(), [])
+        current, peak = _traced_memory()
+        if frames:
+            _update_peak(frames[-1], peak)
+        frame = _Frame(stats=stats, started=time.perf_counter(), base_memory=current)
+        frames.append(frame)
+        if len(_frames_by_thread) > 1:
+            for thread_frames in _frames_by_thread.values():
+                for thread_frame in thread_frames:
+                    thread_frame.shared = True
+        elif tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+    return frame
+
+
+def _exit(frame: _Frame) -> None:
+    elapsed = time.perf_counter() - frame.started
+    with _frames_lock:
+        thread_id = threading.get_ident()
+        frames = _frames_by_thread[thread_id]
+        frames.pop()
+        if frames:
+            frames[-1].stats.child_time += elapsed
+        else:
+            del _frames_by_thread[thread_id]
+        frame.stats.total_time += elapsed
+        _update_peak(frame, _traced_memory()[1])
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.stages: dict[str, StageStats] = {}
+
+    def wrap(self, items: collections_abc.Iterable[T], name: str) -> collections_abc.Generator[T, None, None]:
+        stats = self.stages.setdefault(name, StageStats(name=name))
+        with trace_memory():
+            frame = _enter(stats)
+            try:
+                iterator = iter(items)
+            finally:
+                _exit(frame)
+
+            while True:
+                frame = _enter(stats)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    _exit(frame)
+                stats.items += 1
+                if stats.time_to_first_item is None:
+                    stats.time_to_first_item = stats.total_time
+                yield item
+
+    def stage(
+        self, name: typing.Optional[str] = None
+    ) -> collections_abc.Callable[
+        [collections_abc.Callable[..., collections_abc.Iterable[T]]],
+        collections_abc.Callable[..., collections_abc.Iterator[T]],
+    ]:
+        def decorator(
+            func: collections_abc.Callable[..., collections_abc.Iterable[T]]
+        ) -> collections_abc.Callable[..., collections_abc.Iterator[T]]:
+            @functools.wraps(func)
+            def wrapper(*args: typing.Any, **kwargs: typing.Any) -> collections_abc.Iterator[T]:
+                return self.wrap(func(*args, **kwargs), name or func.__name__)
+
+            return wrapper
+
+        return decorator
+
+    def report(self) -> list[dict[str, typing.Any]]:
+        return [stats.to_dict() for stats in self.stages.values()]
+
+    def write_report(self, file: typing.TextIO) -> None:
+        json.dump(self.report(), file, indent=2)
+        file.write("\n")
+
+
+def print_stats(stats: StageStats) -> None:
+    max_memory = "n/a" if stats.peak_memory is None else f"{stats.peak_memory/1000_000:,.3f} mb"
+    print(f"{stats.name}:\n max_memory: {max_memory}\n exec time: {stats.total_time * 1000:,.3f} ms")
+
+
+class ProfiledIterator(typing.Generic[T]):
+    def __init__(self, iterator: collections_abc.Iterator[T], stats: StageStats):
+        profiler = Profiler()
+        profiler.stages[stats.name] = stats
+        self.stats = stats
+        self._items = profiler.wrap(iterator, stats.name)
+
+    def __iter__(self) -> "ProfiledIterator[T]":
+        return self
+
+    def __next__(self) -> T:
+        return next(self._items)
+
+    def close(self) -> None:
+        self._items.close()
+
 
 def profile(func: typing.Callable) -> typing.Callable:
     @functools.wraps(func)
     def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
-        tracemalloc.start()
-        start = time.time()
-        result = func(*args, **kwargs)
-        elapsed_time = (time.time() - start) * 1000
-        _, mem_peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        print(f"{func.__name__}:\n max_memory: {mem_peak/1000_000:,.3f} mb\n exec time: {elapsed_time:,.3f} ms")
+        stats = StageStats(name=func.__name__)
+        with trace_memory():
+            frame = _enter(stats)
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                _exit(frame)
+        if isinstance(result, collections_abc.Iterator):
+            return ProfiledIterator(result, stats)
+        print_stats(stats)
         return result
 
     return wrapper
@@ -21,4 +209,9 @@ def profile(func: typing.Callable) -> typing.Callable:
 
 __all__ = [
     "profile",
+    "print_stats",
+    "trace_memory",
+    "Profiler",
+    "ProfiledIterator",
+    "StageStats",
 ]
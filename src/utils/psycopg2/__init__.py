@@ -1,9 +1,20 @@
-from .connection import Connection, DbSettings, open_connection
-from .loader import Loader
+from .connection import Connection, Cursor, DbSettings, open_connection
+from .copy_reader import CopyReader
+from .extractor import Extractor, make_row_mapper
+from .loader import FanOutLoader, Loader
+from .parallel_extractor import ParallelExtractor
+from .pool import open_pool
 
 __all__ = [
     "open_connection",
+    "open_pool",
     "Connection",
+    "Cursor",
     "DbSettings",
     "Loader",
+    "FanOutLoader",
+    "CopyReader",
+    "Extractor",
+    "make_row_mapper",
+    "ParallelExtractor",
 ]
@@ -6,6 +6,7 @@ import psycopg2
 import psycopg2.extensions as psycopg2_extensions
 
 Connection = psycopg2_extensions.connection
+Cursor = psycopg2_extensions.cursor
 
 
 class DbSettings(typing.TypedDict):
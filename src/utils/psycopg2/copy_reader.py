@@ -0,0 +1,70 @@
+import collections.abc as collections_abc
+import typing
+
+_ESCAPE_TABLE = str.maketrans(
+    {
+        "\\": "\\\\",
+        "\t": "\\t",
+        "\n": "\\n",
+        "\r": "\\r",
+        "\b": "\\b",
+        "\f": "\\f",
+        "\v": "\\v",
+    }
+)
+NULL = "\\N"
+_CONTAINER_TYPES = (list, tuple, dict, set, frozenset)
+
+
+def encode_value(value: typing.Any) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, _CONTAINER_TYPES):
+        raise TypeError(f"cannot encode {type(value).__name__} as COPY text")
+    return str(value).translate(_ESCAPE_TABLE)
+
+
+def encode_row(row: collections_abc.Iterable[typing.Any], encoding: str = "utf-8") -> bytes:
+    return ("\t".join(encode_value(value) for value in row) + "\n").encode(encoding)
+
+
+class CopyReader:
+    def __init__(self, rows: collections_abc.Iterable[collections_abc.Iterable[typing.Any]], encoding: str = "utf-8"):
+        self._rows = iter(rows)
+        self._encoding = encoding
+        self._buffer = bytearray()
+        self._exhausted = False
+        self.rows_count = 0
+        self.bytes_count = 0
+
+    def _fill(self, size: int) -> None:
+        while size < 0 or len(self._buffer) < size:
+            row = next(self._rows, None)
+            if row is None:
+                self._exhausted = True
+                break
+            self._buffer += encode_row(row, self._encoding)
+            self.rows_count += 1
+
+    def _take(self, size: int) -> bytes:
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_count += len(data)
+        return data
+
+    def read(self, size: int = -1, /) -> bytes:
+        if not self._exhausted:
+            self._fill(size)
+        return self._take(len(self._buffer) if size < 0 else size)
+
+    def readline(self, size: int = -1, /) -> bytes:
+        if b"\n" not in self._buffer and not self._exhausted:
+            self._fill(len(self._buffer) + 1)
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        if 0 <= size < end:
+            end = size
+        return self._take(end)
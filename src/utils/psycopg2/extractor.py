@@ -0,0 +1,126 @@
+import collections.abc as collections_abc
+import contextlib
+import time
+import typing
+import uuid
+
+import psycopg2.extensions as psycopg2_extensions
+
+import utils.chunking as chunking_utils
+import utils.columnar as columnar_utils
+import utils.keyset as keyset_utils
+import utils.rows as rows_utils
+
+from .connection import Connection, Cursor
+
+T = typing.TypeVar("T")
+
+
+@contextlib.contextmanager
+def _read_transaction(connection: Connection) -> collections_abc.Iterator[None]:
+    owned = connection.info.transaction_status == psycopg2_extensions.TRANSACTION_STATUS_IDLE
+    try:
+        yield
+    finally:
+        if owned and not connection.closed:
+            connection.rollback()
+
+
+def make_row_mapper(target: typing.Type[T], cursor: Cursor) -> rows_utils.RowMapper[T]:
+    if cursor.description is None:
+        raise ValueError
+    return rows_utils.make_row_mapper(target, [column.name for column in cursor.description])
+
+
+class Extractor:
+    def __init__(self, connection: Connection, chunk_size: typing.Union[int, chunking_utils.ChunkSizer]):
+        self.connection = connection
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
+
+    def _fetch(self, cursor: Cursor, size: int) -> list[tuple[typing.Any, ...]]:
+        start = time.perf_counter()
+        rows = cursor.fetchmany(size)
+        self.sizer.record(len(rows), time.perf_counter() - start, chunking_utils.estimate_size(rows))
+        return rows
+
+    def extract_with_cursor(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        order_by: collections_abc.Sequence[str] = (),
+    ) -> collections_abc.Iterator[T]:
+        field_names = rows_utils.get_field_names(dataclass)
+        stmt = f"SELECT {', '.join(field_names)} FROM {table_name}"
+        if order_by:
+            stmt += f" ORDER BY {', '.join(order_by)}"
+
+        row_mapper: typing.Optional[rows_utils.RowMapper[T]] = None
+        with _read_transaction(self.connection), self.connection.cursor(name=f"extractor_{uuid.uuid4().hex}") as cursor:
+            cursor.itersize = self.chunk_size
+            cursor.execute(stmt)
+            while rows := self._fetch(cursor, self.chunk_size):
+                if row_mapper is None:
+                    row_mapper = make_row_mapper(dataclass, cursor)
+                yield from row_mapper(rows)
+
+    def extract_with_keyset(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[T]:
+        for page in self.extract_pages_with_keyset(dataclass, table_name, key, lower, upper, after):
+            yield from page
+
+    def extract_pages_with_keyset(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[list[T]]:
+        field_names = rows_utils.get_field_names(dataclass)
+        row_mapper = rows_utils.make_row_mapper(dataclass, field_names)
+        for rows in self._extract_rows_with_keyset(field_names, table_name, key, lower, upper, after):
+            yield list(row_mapper(rows))
+
+    def extract_columnar_with_keyset(
+        self,
+        dataclass: type,
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        typecodes: typing.Optional[collections_abc.Mapping[str, str]] = None,
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[columnar_utils.ColumnarBatch]:
+        field_names = rows_utils.get_field_names(dataclass)
+        for rows in self._extract_rows_with_keyset(field_names, table_name, key, lower, upper, after):
+            yield columnar_utils.ColumnarBatch.from_tuples(field_names, rows, typecodes)
+
+    def _extract_rows_with_keyset(
+        self,
+        field_names: tuple[str, ...],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any,
+        upper: typing.Any,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]],
+    ) -> collections_abc.Iterator[list[tuple[typing.Any, ...]]]:
+        query = keyset_utils.build_query(field_names, table_name, key, "%s", lower, upper)
+        with _read_transaction(self.connection), self.connection.cursor() as cursor:
+
+            def execute(stmt: str, data: tuple[typing.Any, ...]) -> list[tuple[typing.Any, ...]]:
+                cursor.execute(stmt, data)
+                return cursor.fetchall()
+
+            yield from keyset_utils.iter_pages(execute, query, self.sizer, after)
@@ -1,18 +1,99 @@
 import collections.abc as collections_abc
 import dataclasses
+import functools
+import itertools
+import time
 import typing
+import uuid
 
-import more_itertools
+import utils.chunking as chunking_utils
+import utils.rows as rows_utils
 
 from .connection import Connection
+from .copy_reader import CopyReader
 
 T = typing.TypeVar("T")
 
+COPY = "copy"
+VALUES = "values"
+
+
+@functools.lru_cache(maxsize=128)
+def _build_values_parts(table_name: str, field_names: tuple[str, ...]) -> tuple[str, str]:
+    return f"INSERT INTO {table_name} ({','.join(field_names)}) VALUES ", f"({', '.join('%s' for _ in field_names)})"
+
+
+def _build_values_stmt(table_name: str, field_names: tuple[str, ...], rows_count: int) -> str:
+    prefix, row_placeholder = _build_values_parts(table_name, field_names)
+    return prefix + ",".join(itertools.repeat(row_placeholder, rows_count))
+
+
+@functools.lru_cache(maxsize=128)
+def _build_conflict_clause(conflict_columns: tuple[str, ...], update_columns: tuple[str, ...]) -> str:
+    if not update_columns:
+        return f" ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    return f" ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {assignments}"
+
+
+def _build_upsert_stmt(
+    table_name: str,
+    field_names: tuple[str, ...],
+    rows_count: int,
+    conflict_columns: tuple[str, ...],
+    update_columns: tuple[str, ...],
+) -> str:
+    return _build_values_stmt(table_name, field_names, rows_count) + _build_conflict_clause(
+        conflict_columns, update_columns
+    )
+
+
+def _build_staging_stmt(table_name: str, staging_table: str, field_names: tuple[str, ...]) -> str:
+    return (
+        f"CREATE TEMPORARY TABLE {staging_table} ON COMMIT DELETE ROWS AS "
+        f"SELECT {','.join(field_names)} FROM {table_name} WITH NO DATA"
+    )
+
+
+def _build_merge_stmt(
+    table_name: str,
+    staging_table: str,
+    field_names: tuple[str, ...],
+    conflict_columns: tuple[str, ...],
+    update_columns: tuple[str, ...],
+) -> str:
+    columns = ",".join(field_names)
+    return f"INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {staging_table}" + _build_conflict_clause(
+        conflict_columns, update_columns
+    )
+
+
+def _get_upsert_columns(
+    field_names: tuple[str, ...],
+    conflict_columns: collections_abc.Sequence[str],
+    update_columns: typing.Optional[collections_abc.Sequence[str]],
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    if update_columns is None:
+        update_columns = [column for column in field_names if column not in conflict_columns]
+    if not conflict_columns or any(column not in field_names for column in [*conflict_columns, *update_columns]):
+        raise ValueError
+    return tuple(conflict_columns), tuple(update_columns)
+
+
+def _deduplicate(
+    rows: collections_abc.Iterable[tuple[typing.Any, ...]], key_indexes: collections_abc.Sequence[int]
+) -> list[tuple[typing.Any, ...]]:
+    return list({tuple(row[index] for index in key_indexes): row for row in rows}.values())
+
 
 class Loader:
-    def __init__(self, connection: Connection, chunk_size: int):
+    def __init__(self, connection: Connection, chunk_size: typing.Union[int, chunking_utils.ChunkSizer]):
         self.connection = connection
-        self.chunk_size = chunk_size
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
 
     def load_from_iterable(
         self,
@@ -20,13 +101,173 @@ class Loader:
         dataclass: typing.Type[T],
         table_name: str,
     ) -> None:
-        if not dataclasses.is_dataclass(dataclass):
-            raise ValueError
-
-        field_names = [field.name for field in dataclasses.fields(dataclass)]
+        field_names = rows_utils.get_field_names(dataclass)
         stmt = f"INSERT INTO {table_name} ({','.join(field_names)}) VALUES ({', '.join('%s' for _ in field_names)})"
         with self.connection.cursor() as cursor:
-            for chunk in more_itertools.ichunked(items, self.chunk_size):
+            for chunk in self.sizer.chunked(items):
+                start = time.perf_counter()
                 data = [dataclasses.astuple(item) for item in chunk]
                 cursor.executemany(stmt, data)
                 self.connection.commit()
+                self.sizer.record(len(chunk), time.perf_counter() - start, chunking_utils.estimate_size(data))
+
+    def values_from_iterable(
+        self,
+        items: collections_abc.Iterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+    ) -> None:
+        field_names = rows_utils.get_field_names(dataclass)
+        getter = rows_utils.make_getter(field_names)
+        with self.connection.cursor() as cursor:
+            for chunk in self.sizer.chunked(items):
+                start = time.perf_counter()
+                stmt = _build_values_stmt(table_name, field_names, len(chunk))
+                cursor.execute(stmt, list(itertools.chain.from_iterable(map(getter, chunk))))
+                self.connection.commit()
+                self.sizer.record(len(chunk), time.perf_counter() - start, len(cursor.query or b""))
+
+    def copy_from_iterable(
+        self,
+        items: collections_abc.Iterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+    ) -> None:
+        field_names = rows_utils.get_field_names(dataclass)
+        getter = rows_utils.make_getter(field_names)
+        stmt = f"COPY {table_name} ({','.join(field_names)}) FROM STDIN"
+        with self.connection.cursor() as cursor:
+            for chunk in self.sizer.ichunked(items):
+                start = time.perf_counter()
+                reader = CopyReader(map(getter, chunk))
+                cursor.copy_expert(stmt, reader)
+                self.connection.commit()
+                self.sizer.record(reader.rows_count, time.perf_counter() - start, reader.bytes_count)
+
+    def upsert_from_iterable(
+        self,
+        items: collections_abc.Iterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+        conflict_columns: collections_abc.Sequence[str],
+        update_columns: typing.Optional[collections_abc.Sequence[str]] = None,
+    ) -> None:
+        field_names = rows_utils.get_field_names(dataclass)
+        conflict_columns, update_columns = _get_upsert_columns(field_names, conflict_columns, update_columns)
+        getter = rows_utils.make_getter(field_names)
+        key_indexes = [field_names.index(column) for column in conflict_columns]
+        with self.connection.cursor() as cursor:
+            for chunk in self.sizer.chunked(items):
+                start = time.perf_counter()
+                rows = _deduplicate(map(getter, chunk), key_indexes)
+                stmt = _build_upsert_stmt(table_name, field_names, len(rows), conflict_columns, update_columns)
+                cursor.execute(stmt, list(itertools.chain.from_iterable(rows)))
+                self.connection.commit()
+                self.sizer.record(len(chunk), time.perf_counter() - start, len(cursor.query or b""))
+
+    def copy_upsert_from_iterable(
+        self,
+        items: collections_abc.Iterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+        conflict_columns: collections_abc.Sequence[str],
+        update_columns: typing.Optional[collections_abc.Sequence[str]] = None,
+    ) -> None:
+        field_names = rows_utils.get_field_names(dataclass)
+        conflict_columns, update_columns = _get_upsert_columns(field_names, conflict_columns, update_columns)
+        getter = rows_utils.make_getter(field_names)
+        key_indexes = [field_names.index(column) for column in conflict_columns]
+        columns = ",".join(field_names)
+        staging_table = f"staging_{uuid.uuid4().hex}"
+        create_stmt = _build_staging_stmt(table_name, staging_table, field_names)
+        copy_stmt = f"COPY {staging_table} ({columns}) FROM STDIN"
+        merge_stmt = _build_merge_stmt(table_name, staging_table, field_names, conflict_columns, update_columns)
+        created = False
+        with self.connection.cursor() as cursor:
+            for chunk in self.sizer.chunked(items):
+                start = time.perf_counter()
+                reader = CopyReader(_deduplicate(map(getter, chunk), key_indexes))
+                if not created:
+                    cursor.execute(create_stmt)
+                    created = True
+                cursor.copy_expert(copy_stmt, reader)
+                cursor.execute(merge_stmt)
+                self.connection.commit()
+                self.sizer.record(len(chunk), time.perf_counter() - start, reader.bytes_count)
+            if created:
+                cursor.execute(f"DROP TABLE {staging_table}")
+                self.connection.commit()
+
+
+class FanOutLoader:
+    def __init__(
+        self,
+        connection: Connection,
+        chunk_size: typing.Union[int, chunking_utils.ChunkSizer],
+        tables: collections_abc.Sequence[tuple[type, str]],
+        strategy: str = COPY,
+    ):
+        if strategy not in (COPY, VALUES):
+            raise ValueError
+        self.connection = connection
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+        self.tables = rows_utils.make_ordered_mapping(tables)
+        self.strategy = strategy
+        self.counts = {table_name: 0 for table_name in self.tables.values()}
+        self._getters = {
+            dataclass: rows_utils.make_getter(rows_utils.get_field_names(dataclass)) for dataclass in self.tables
+        }
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
+
+    def _flush_table(self, cursor: typing.Any, dataclass: type, table_name: str, rows: list[typing.Any]) -> int:
+        field_names = rows_utils.get_field_names(dataclass)
+        data = map(self._getters[dataclass], rows)
+        if self.strategy == COPY:
+            reader = CopyReader(data)
+            cursor.copy_expert(f"COPY {table_name} ({','.join(field_names)}) FROM STDIN", reader)
+            return reader.bytes_count
+        cursor.execute(
+            _build_values_stmt(table_name, field_names, len(rows)), list(itertools.chain.from_iterable(data))
+        )
+        return len(cursor.query or b"")
+
+    def _flush(self, cursor: typing.Any, buffers: dict[type, list[typing.Any]]) -> None:
+        start = time.perf_counter()
+        rows_count = 0
+        bytes_count = 0
+        try:
+            for dataclass, table_name in self.tables.items():
+                rows = buffers[dataclass]
+                if rows:
+                    bytes_count += self._flush_table(cursor, dataclass, table_name, rows)
+                    rows_count += len(rows)
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+        for dataclass, table_name in self.tables.items():
+            self.counts[table_name] += len(buffers[dataclass])
+            buffers[dataclass].clear()
+        self.sizer.record(rows_count, time.perf_counter() - start, bytes_count)
+
+    def load_from_iterable(self, items: collections_abc.Iterable[typing.Any]) -> None:
+        buffers: dict[type, list[typing.Any]] = {dataclass: [] for dataclass in self.tables}
+        buffered = 0
+        with self.connection.cursor() as cursor:
+            for item in items:
+                buffer = buffers.get(type(item))
+                if buffer is None:
+                    try:
+                        buffer = buffers[type(item)] = rows_utils.find_by_mro(buffers, type(item))
+                    except ValueError:
+                        raise TypeError(f"no table for {type(item).__name__}") from None
+                buffer.append(item)
+                buffered += 1
+                if buffered >= self.chunk_size:
+                    self._flush(cursor, buffers)
+                    buffered = 0
+            if buffered:
+                self._flush(cursor, buffers)
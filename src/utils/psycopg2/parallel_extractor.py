@@ -0,0 +1,142 @@
+import collections.abc as collections_abc
+import concurrent.futures
+import contextlib
+import math
+import queue
+import threading
+import typing
+
+import utils.pool as pool_utils
+
+from .connection import Connection, DbSettings, open_connection
+from .extractor import Extractor
+
+T = typing.TypeVar("T")
+
+Range = tuple[typing.Any, typing.Any]
+
+PUT_TIMEOUT = 0.1
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ParallelExtractor:
+    def __init__(
+        self,
+        settings: DbSettings,
+        connections_count: int,
+        chunk_size: int,
+        queue_size: int = 4,
+        pool: typing.Optional[pool_utils.Pool[Connection]] = None,
+    ):
+        if connections_count < 1:
+            raise ValueError
+        self.settings = settings
+        self.connections_count = connections_count
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.pool = pool
+
+    def _open_connection(self) -> contextlib.AbstractContextManager[Connection]:
+        if self.pool is not None:
+            return self.pool.connection()
+        return open_connection(self.settings)
+
+    def get_minmax_ranges(self, table_name: str, key: str) -> list[Range]:
+        with self._open_connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT min({key}), max({key}) FROM {table_name}")
+            row = cursor.fetchone()
+            connection.rollback()
+        if row is None or row[0] is None:
+            return [(None, None)]
+        min_key, max_key = row
+        if not isinstance(min_key, int) or not isinstance(max_key, int):
+            raise ValueError
+        step = math.ceil((max_key - min_key + 1) / self.connections_count)
+        return _ranges_from_boundaries([min_key + step * i for i in range(1, self.connections_count)])
+
+    def get_sampled_ranges(self, table_name: str, key: str, sample_percent: float = 1.0) -> list[Range]:
+        with self._open_connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT {key} FROM {table_name} TABLESAMPLE SYSTEM (%s) ORDER BY 1", (sample_percent,))
+            sample = [row[0] for row in cursor.fetchall()]
+            connection.rollback()
+        boundaries = [sample[len(sample) * i // self.connections_count] for i in range(1, self.connections_count)]
+        return _ranges_from_boundaries(boundaries if sample else [])
+
+    def extract(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        ordered: bool = True,
+        ranges: typing.Optional[list[Range]] = None,
+    ) -> collections_abc.Iterator[T]:
+        if not key:
+            raise ValueError
+        if ranges is None:
+            ranges = self.get_minmax_ranges(table_name, key[0])
+
+        stop = threading.Event()
+        queues: list[queue.Queue[typing.Any]]
+        if ordered:
+            queues = [queue.Queue(maxsize=self.queue_size) for _ in ranges]
+        else:
+            queues = [queue.Queue(maxsize=self.queue_size * len(ranges))] * len(ranges)
+
+        def put(items_queue: queue.Queue[typing.Any], item: typing.Any) -> bool:
+            while not stop.is_set():
+                try:
+                    items_queue.put(item, timeout=PUT_TIMEOUT)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def extract_range(index: int) -> None:
+            lower, upper = ranges[index]
+            try:
+                with self._open_connection() as connection:
+                    extractor = Extractor(connection, self.chunk_size)
+                    for page in extractor.extract_pages_with_keyset(dataclass, table_name, key, lower, upper):
+                        if not put(queues[index], page):
+                            return
+                    connection.rollback()
+            except BaseException as error:
+                put(queues[index], _Failed(error))
+            else:
+                put(queues[index], _Done())
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.connections_count) as executor:
+            for index in range(len(ranges)):
+                executor.submit(extract_range, index)
+            try:
+                if ordered:
+                    for items_queue in queues:
+                        yield from _drain(items_queue, 1)
+                else:
+                    yield from _drain(queues[0], len(ranges))
+            finally:
+                stop.set()
+
+
+def _ranges_from_boundaries(boundaries: list[typing.Any]) -> list[Range]:
+    unique_boundaries = sorted(set(boundaries))
+    return list(zip([None, *unique_boundaries], [*unique_boundaries, None]))
+
+
+def _drain(items_queue: queue.Queue[typing.Any], producers_count: int) -> collections_abc.Iterator[typing.Any]:
+    while producers_count:
+        item = items_queue.get()
+        if isinstance(item, _Done):
+            producers_count -= 1
+        elif isinstance(item, _Failed):
+            raise item.error
+        else:
+            yield from item
@@ -0,0 +1,54 @@
+import collections.abc as collections_abc
+import contextlib
+
+import psycopg2
+
+import utils.pool as pool_utils
+
+from .connection import Connection, DbSettings
+
+
+def _check(connection: Connection) -> bool:
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.rollback()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+def _reset(connection: Connection) -> None:
+    if connection.closed:
+        raise psycopg2.InterfaceError
+    connection.rollback()
+
+
+def _close(connection: Connection) -> None:
+    connection.close()
+
+
+@contextlib.contextmanager
+def open_pool(
+    settings: DbSettings,
+    min_size: int,
+    max_size: int,
+    max_idle_time: float = 600.0,
+    check_idle_time: float = 30.0,
+) -> collections_abc.Iterator[pool_utils.Pool[Connection]]:
+    pool = pool_utils.Pool(
+        connect=lambda: psycopg2.connect(**settings),
+        check=_check,
+        reset=_reset,
+        close=_close,
+        min_size=min_size,
+        max_size=max_size,
+        max_idle_time=max_idle_time,
+        check_idle_time=check_idle_time,
+    )
+    try:
+        yield pool
+    finally:
+        pool.close()
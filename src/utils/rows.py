@@ -0,0 +1,67 @@
+import collections.abc as collections_abc
+import dataclasses
+import functools
+import itertools
+import operator
+import typing
+
+T = typing.TypeVar("T")
+
+RowMapper = collections_abc.Callable[[collections_abc.Iterable[tuple[typing.Any, ...]]], collections_abc.Iterator[T]]
+
+
+def is_namedtuple(target: type) -> bool:
+    return issubclass(target, tuple) and hasattr(target, "_fields")
+
+
+def get_field_names(dataclass: type) -> tuple[str, ...]:
+    if is_namedtuple(dataclass):
+        return tuple(dataclass._fields)  # type: ignore[attr-defined]
+    if not dataclasses.is_dataclass(dataclass):
+        raise ValueError
+    return tuple(field.name for field in dataclasses.fields(dataclass))
+
+
+def make_getter(
+    field_names: collections_abc.Sequence[str],
+) -> collections_abc.Callable[[typing.Any], tuple[typing.Any, ...]]:
+    getter = operator.attrgetter(*field_names)
+    if len(field_names) == 1:
+        return lambda item: (getter(item),)
+    return getter
+
+
+def make_row_mapper(target: typing.Type[T], column_names: collections_abc.Sequence[str]) -> RowMapper[T]:
+    if target is tuple:
+        return iter  # type: ignore[return-value]
+    field_names = get_field_names(target)
+    if tuple(column_names) != field_names:
+        raise ValueError(f"columns {tuple(column_names)} do not match {target.__name__} fields {field_names}")
+    if is_namedtuple(target):
+        return functools.partial(map, target._make)  # type: ignore[attr-defined]
+    return functools.partial(itertools.starmap, target)
+
+
+def make_ordered_mapping(pairs: collections_abc.Sequence[tuple[type, T]]) -> dict[type, T]:
+    mapping = dict(pairs)
+    if len(mapping) != len(pairs):
+        raise ValueError
+    return mapping
+
+
+def find_by_mro(mapping: collections_abc.Mapping[type, T], target: type) -> T:
+    for base in target.__mro__:
+        if base in mapping:
+            return mapping[base]
+    raise ValueError(target)
+
+
+__all__ = [
+    "get_field_names",
+    "make_getter",
+    "make_row_mapper",
+    "is_namedtuple",
+    "RowMapper",
+    "make_ordered_mapping",
+    "find_by_mro",
+]
@@ -0,0 +1,95 @@
+import collections.abc as collections_abc
+import dataclasses
+import tempfile
+import typing
+
+import more_itertools
+
+import utils.chunking as chunking_utils
+import utils.merge as merge_utils
+import utils.spill as spill_utils
+
+T = typing.TypeVar("T")
+
+MAX_FAN_IN = 64
+BUDGET_CHECK_INTERVAL = 256
+
+
+def _item_values(item: typing.Any) -> collections_abc.Sequence[typing.Any]:
+    if dataclasses.is_dataclass(item):
+        return [getattr(item, field.name) for field in dataclasses.fields(item)]
+    if isinstance(item, (tuple, list)):
+        return item
+    return (item,)
+
+
+def estimate_items_size(items: collections_abc.Sequence[typing.Any]) -> int:
+    if not items:
+        return 0
+    sample = items[:: max(1, len(items) // chunking_utils.SAMPLE_SIZE)]
+    return chunking_utils.estimate_size([_item_values(item) for item in sample]) * len(items) // len(sample)
+
+
+def _write_run(items: collections_abc.Iterable[typing.Any], directory: str, block_size: int) -> spill_utils.SpillFile:
+    run = spill_utils.SpillFile(directory, block_size)
+    run.write_many(items)
+    run.close()
+    return run
+
+
+def _read_runs(
+    items: collections_abc.Iterable[T], run_size: int, memory_budget: typing.Optional[int]
+) -> collections_abc.Iterator[tuple[list[T], bool]]:
+    run: list[T] = []
+    for item in items:
+        run.append(item)
+        if len(run) >= run_size or (
+            memory_budget is not None
+            and len(run) % BUDGET_CHECK_INTERVAL == 0
+            and estimate_items_size(run) >= memory_budget
+        ):
+            yield run, False
+            run = []
+    if run:
+        yield run, True
+
+
+def external_sort(
+    items: collections_abc.Iterable[T],
+    key: typing.Optional[collections_abc.Callable[[T], typing.Any]] = None,
+    run_size: int = 100_000,
+    max_fan_in: int = MAX_FAN_IN,
+    directory: typing.Optional[str] = None,
+    memory_budget: typing.Optional[int] = None,
+) -> collections_abc.Iterator[T]:
+    if run_size < 1 or max_fan_in < 2 or (memory_budget is not None and memory_budget < 1):
+        raise ValueError
+
+    with tempfile.TemporaryDirectory(dir=directory) as runs_directory:
+        runs: list[spill_utils.SpillFile] = []
+        block_size = spill_utils.BLOCK_SIZE
+        for chunk, last in _read_runs(items, run_size, memory_budget):
+            chunk.sort(key=key)  # type: ignore[arg-type]
+            if not runs and last:
+                yield from chunk
+                return
+            block_size = min(block_size, max(1, len(chunk) // max_fan_in))
+            runs.append(_write_run(chunk, runs_directory, block_size))
+            del chunk
+
+        while len(runs) > max_fan_in:
+            merged_runs = [
+                _write_run(
+                    merge_utils.merge_sorted(*(run.read() for run in group), key=key), runs_directory, block_size
+                )
+                for group in more_itertools.chunked(runs, max_fan_in)
+            ]
+            runs = merged_runs
+
+        yield from merge_utils.merge_sorted(*(run.read() for run in runs), key=key)
+
+
+__all__ = [
+    "external_sort",
+    "estimate_items_size",
+]
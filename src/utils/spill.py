@@ -0,0 +1,52 @@
+import collections.abc as collections_abc
+import os
+import pickle
+import tempfile
+import typing
+
+BLOCK_SIZE = 1024
+
+
+class SpillFile:
+    def __init__(self, directory: str, block_size: int = BLOCK_SIZE):
+        fd, self.path = tempfile.mkstemp(dir=directory, suffix=".spill")
+        self._file = os.fdopen(fd, "wb")
+        self._block: list[typing.Any] = []
+        self.block_size = block_size
+        self.count = 0
+
+    def write(self, item: typing.Any) -> None:
+        self._block.append(item)
+        self.count += 1
+        if len(self._block) >= self.block_size:
+            self._flush()
+
+    def write_many(self, items: collections_abc.Iterable[typing.Any]) -> None:
+        for item in items:
+            self.write(item)
+
+    def _flush(self) -> None:
+        if self._block:
+            pickle.dump(self._block, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._block = []
+
+    def close(self) -> None:
+        self._flush()
+        self._file.close()
+
+    def read(self) -> collections_abc.Iterator[typing.Any]:
+        self.close()
+        with open(self.path, "rb") as file:
+            while True:
+                try:
+                    block = pickle.load(file)
+                except EOFError:
+                    break
+                yield from block
+        os.remove(self.path)
+
+
+__all__ = [
+    "SpillFile",
+    "BLOCK_SIZE",
+]
@@ -1,7 +1,19 @@
+from .checkpoint import CheckpointStore
 from .connection import Connection, DbSettings, open_connection
+from .extractor import Extractor, make_row_mapper
+from .hash_index import HashIndex
+from .loader import FanOutLoader, Loader
+from .pool import open_pool
 
 __all__ = [
     "open_connection",
+    "open_pool",
     "Connection",
     "DbSettings",
+    "Loader",
+    "FanOutLoader",
+    "Extractor",
+    "make_row_mapper",
+    "CheckpointStore",
+    "HashIndex",
 ]
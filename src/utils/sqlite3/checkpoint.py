@@ -0,0 +1,115 @@
+import collections.abc as collections_abc
+import datetime
+import decimal
+import json
+import time
+import typing
+import uuid
+
+import utils.rows as rows_utils
+
+from .connection import Connection
+
+CHECKPOINTS_TABLE = "checkpoints"
+
+_TYPE = "__type__"
+_VALUE = "value"
+_ENCODERS: dict[type, tuple[str, collections_abc.Callable[[typing.Any], typing.Any]]] = {
+    datetime.datetime: ("datetime", datetime.datetime.isoformat),
+    datetime.date: ("date", datetime.date.isoformat),
+    datetime.time: ("time", datetime.time.isoformat),
+    decimal.Decimal: ("decimal", str),
+    uuid.UUID: ("uuid", str),
+    bytes: ("bytes", bytes.hex),
+}
+_DECODERS: dict[str, collections_abc.Callable[[typing.Any], typing.Any]] = {
+    "datetime": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+    "decimal": decimal.Decimal,
+    "uuid": uuid.UUID,
+    "bytes": bytes.fromhex,
+}
+
+
+def _encode_value(value: typing.Any) -> typing.Any:
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        raise ValueError(type(value))
+    type_name, encode = encoder
+    return {_TYPE: type_name, _VALUE: encode(value)}
+
+
+def _decode_value(value: dict[str, typing.Any]) -> typing.Any:
+    if _TYPE not in value:
+        return value
+    return _DECODERS[value[_TYPE]](value[_VALUE])
+
+
+def encode_key(key: collections_abc.Sequence[typing.Any]) -> str:
+    return json.dumps(list(key), default=_encode_value)
+
+
+def decode_key(data: str) -> tuple[typing.Any, ...]:
+    return tuple(json.loads(data, object_hook=_decode_value))
+
+
+class CheckpointStore:
+    def __init__(self, connection: Connection, table_name: str = CHECKPOINTS_TABLE):
+        if connection.in_transaction:
+            raise ValueError("creating a checkpoint store requires no open transaction")
+        self.connection = connection
+        self.table_name = table_name
+        self.connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table_name}(
+                source text NOT NULL,
+                job text NOT NULL,
+                key text NOT NULL,
+                updated_at real NOT NULL,
+                PRIMARY KEY (source, job)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def load(self, source: str, job: str) -> typing.Optional[tuple[typing.Any, ...]]:
+        row = self.connection.execute(
+            f"SELECT key FROM {self.table_name} WHERE source = ? AND job = ?", (source, job)
+        ).fetchone()
+        if row is None:
+            return None
+        return decode_key(row[0])
+
+    def save(self, source: str, job: str, key: collections_abc.Sequence[typing.Any], commit: bool = True) -> None:
+        self.connection.execute(
+            f"""
+            INSERT INTO {self.table_name} (source, job, key, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (source, job) DO UPDATE SET key = excluded.key, updated_at = excluded.updated_at
+            """,
+            (source, job, encode_key(key), time.time()),
+        )
+        if commit:
+            self.connection.commit()
+
+    def reset(self, source: str, job: str) -> None:
+        self.connection.execute(f"DELETE FROM {self.table_name} WHERE source = ? AND job = ?", (source, job))
+        self.connection.commit()
+
+    def track(
+        self, source: str, job: str, key: collections_abc.Sequence[str]
+    ) -> collections_abc.Callable[[list[typing.Any]], None]:
+        getter = rows_utils.make_getter(tuple(key))
+
+        def on_chunk(chunk: list[typing.Any]) -> None:
+            if chunk:
+                self.save(source, job, getter(chunk[-1]), commit=False)
+
+        return on_chunk
+
+
+__all__ = [
+    "CheckpointStore",
+    "encode_key",
+    "decode_key",
+]
@@ -0,0 +1,140 @@
+import collections.abc as collections_abc
+import sqlite3
+import time
+import typing
+
+import utils.chunking as chunking_utils
+import utils.columnar as columnar_utils
+import utils.keyset as keyset_utils
+import utils.rows as rows_utils
+
+from .connection import Connection
+
+T = typing.TypeVar("T")
+
+ROWID = "rowid"
+
+
+def make_row_mapper(target: typing.Type[T], cursor: sqlite3.Cursor) -> rows_utils.RowMapper[T]:
+    if cursor.description is None:
+        raise ValueError
+    return rows_utils.make_row_mapper(target, [column[0] for column in cursor.description])
+
+
+class Extractor:
+    def __init__(self, connection: Connection, chunk_size: typing.Union[int, chunking_utils.ChunkSizer]):
+        self.connection = connection
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
+
+    def _fetch(self, cursor: sqlite3.Cursor, size: int) -> list[tuple[typing.Any, ...]]:
+        start = time.perf_counter()
+        rows = cursor.fetchmany(size)
+        self.sizer.record(len(rows), time.perf_counter() - start, chunking_utils.estimate_size(rows))
+        return rows
+
+    def extract_with_cursor(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        order_by: collections_abc.Sequence[str] = (),
+    ) -> collections_abc.Iterator[T]:
+        field_names = rows_utils.get_field_names(dataclass)
+        row_mapper = rows_utils.make_row_mapper(dataclass, field_names)
+        stmt = f"SELECT {', '.join(field_names)} FROM {table_name}"
+        if order_by:
+            stmt += f" ORDER BY {', '.join(order_by)}"
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(stmt)
+            while True:
+                cursor.arraysize = self.chunk_size
+                rows = self._fetch(cursor, cursor.arraysize)
+                if not rows:
+                    break
+                yield from row_mapper(rows)
+        finally:
+            cursor.close()
+
+    def extract_with_rowid(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        lower: typing.Optional[int] = None,
+        upper: typing.Optional[int] = None,
+        after: typing.Optional[int] = None,
+    ) -> collections_abc.Iterator[T]:
+        yield from self.extract_with_keyset(
+            dataclass, table_name, [ROWID], lower, upper, None if after is None else [after]
+        )
+
+    def extract_with_keyset(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[T]:
+        for page in self.extract_pages_with_keyset(dataclass, table_name, key, lower, upper, after):
+            yield from page
+
+    def extract_pages_with_keyset(
+        self,
+        dataclass: typing.Type[T],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[list[T]]:
+        field_names = rows_utils.get_field_names(dataclass)
+        row_mapper = rows_utils.make_row_mapper(dataclass, field_names)
+        for rows in self._extract_rows_with_keyset(field_names, table_name, key, lower, upper, after):
+            yield list(row_mapper(rows))
+
+    def extract_columnar_with_keyset(
+        self,
+        dataclass: type,
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        typecodes: typing.Optional[collections_abc.Mapping[str, str]] = None,
+        lower: typing.Any = None,
+        upper: typing.Any = None,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]] = None,
+    ) -> collections_abc.Iterator[columnar_utils.ColumnarBatch]:
+        field_names = rows_utils.get_field_names(dataclass)
+        for rows in self._extract_rows_with_keyset(field_names, table_name, key, lower, upper, after):
+            yield columnar_utils.ColumnarBatch.from_tuples(field_names, rows, typecodes)
+
+    def _extract_rows_with_keyset(
+        self,
+        field_names: tuple[str, ...],
+        table_name: str,
+        key: collections_abc.Sequence[str],
+        lower: typing.Any,
+        upper: typing.Any,
+        after: typing.Optional[collections_abc.Sequence[typing.Any]],
+    ) -> collections_abc.Iterator[list[tuple[typing.Any, ...]]]:
+        query = keyset_utils.build_query(field_names, table_name, key, "?", lower, upper)
+        cursor = self.connection.cursor()
+
+        def execute(stmt: str, data: tuple[typing.Any, ...]) -> list[tuple[typing.Any, ...]]:
+            cursor.execute(stmt, data)
+            return cursor.fetchall()
+
+        try:
+            yield from keyset_utils.iter_pages(execute, query, self.sizer, after)
+        finally:
+            cursor.close()
+
+
+__all__ = [
+    "Extractor",
+    "make_row_mapper",
+]
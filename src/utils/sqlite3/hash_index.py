@@ -0,0 +1,69 @@
+import collections.abc as collections_abc
+
+import more_itertools
+
+from .connection import Connection
+
+HASH_INDEX_TABLE = "row_hashes"
+LOOKUP_CHUNK_SIZE = 500
+
+
+class HashIndex:
+    def __init__(self, connection: Connection, namespace: str, table_name: str = HASH_INDEX_TABLE):
+        self.connection = connection
+        self.namespace = namespace
+        self.table_name = table_name
+        self.connection.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table_name}(
+                namespace text NOT NULL,
+                key blob NOT NULL,
+                hash blob NOT NULL,
+                PRIMARY KEY (namespace, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self.connection.commit()
+
+    def __len__(self) -> int:
+        (count,) = self.connection.execute(
+            f"SELECT count(*) FROM {self.table_name} WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return int(count)
+
+    def keys(self) -> collections_abc.Iterator[bytes]:
+        cursor = self.connection.execute(f"SELECT key FROM {self.table_name} WHERE namespace = ?", (self.namespace,))
+        try:
+            while rows := cursor.fetchmany(LOOKUP_CHUNK_SIZE):
+                for (key,) in rows:
+                    yield key
+        finally:
+            cursor.close()
+
+    def get_many(self, keys: collections_abc.Iterable[bytes]) -> dict[bytes, bytes]:
+        hashes: dict[bytes, bytes] = {}
+        for chunk in more_itertools.chunked(keys, LOOKUP_CHUNK_SIZE):
+            stmt = (
+                f"SELECT key, hash FROM {self.table_name} "
+                f"WHERE namespace = ? AND key IN ({', '.join('?' for _ in chunk)})"
+            )
+            hashes.update(self.connection.execute(stmt, (self.namespace, *chunk)).fetchall())
+        return hashes
+
+    def put_many(self, hashes: collections_abc.Iterable[tuple[bytes, bytes]], commit: bool = True) -> None:
+        self.connection.executemany(
+            f"INSERT INTO {self.table_name} (namespace, key, hash) VALUES (?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET hash = excluded.hash",
+            ((self.namespace, key, row_hash) for key, row_hash in hashes),
+        )
+        if commit:
+            self.connection.commit()
+
+    def clear(self) -> None:
+        self.connection.execute(f"DELETE FROM {self.table_name} WHERE namespace = ?", (self.namespace,))
+        self.connection.commit()
+
+
+__all__ = [
+    "HashIndex",
+]
@@ -0,0 +1,157 @@
+import collections.abc as collections_abc
+import contextlib
+import functools
+import sqlite3
+import time
+import typing
+
+import utils.chunking as chunking_utils
+import utils.rows as rows_utils
+
+from .connection import Connection
+
+T = typing.TypeVar("T")
+
+FAST_INGEST_JOURNAL_MODE = "MEMORY"
+FAST_INGEST_SYNCHRONOUS = "OFF"
+
+
+@functools.lru_cache(maxsize=128)
+def _build_insert_stmt(table_name: str, field_names: tuple[str, ...]) -> str:
+    return f"INSERT INTO {table_name} ({','.join(field_names)}) VALUES ({', '.join('?' for _ in field_names)})"
+
+
+@contextlib.contextmanager
+def _ingest_profile(connection: Connection, fast_ingest: bool) -> collections_abc.Iterator[None]:
+    if connection.in_transaction:
+        raise ValueError("loading requires no open transaction")
+    if not fast_ingest:
+        yield
+        return
+
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = connection.execute("PRAGMA synchronous").fetchone()[0]
+    connection.execute(f"PRAGMA journal_mode = {FAST_INGEST_JOURNAL_MODE}")
+    connection.execute(f"PRAGMA synchronous = {FAST_INGEST_SYNCHRONOUS}")
+    try:
+        yield
+    finally:
+        if connection.in_transaction:
+            connection.rollback()
+        connection.execute(f"PRAGMA synchronous = {synchronous}")
+        connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+
+class Loader:
+    def __init__(
+        self,
+        connection: Connection,
+        chunk_size: typing.Union[int, chunking_utils.ChunkSizer],
+        fast_ingest: bool = False,
+    ):
+        self.connection = connection
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+        self.fast_ingest = fast_ingest
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
+
+    def load_from_iterable(
+        self,
+        items: collections_abc.Iterable[T],
+        dataclass: typing.Type[T],
+        table_name: str,
+        on_chunk: typing.Optional[collections_abc.Callable[[list[T]], None]] = None,
+    ) -> None:
+        field_names = rows_utils.get_field_names(dataclass)
+        getter = rows_utils.make_getter(field_names)
+        stmt = _build_insert_stmt(table_name, field_names)
+        with _ingest_profile(self.connection, self.fast_ingest):
+            cursor = self.connection.cursor()
+            try:
+                for chunk in self.sizer.chunked(items):
+                    start = time.perf_counter()
+                    data = list(map(getter, chunk))
+                    cursor.execute("BEGIN")
+                    try:
+                        cursor.executemany(stmt, data)
+                        if on_chunk is not None:
+                            on_chunk(chunk)
+                    except BaseException:
+                        self.connection.rollback()
+                        raise
+                    self.connection.commit()
+                    self.sizer.record(len(chunk), time.perf_counter() - start, chunking_utils.estimate_size(data))
+            finally:
+                cursor.close()
+
+
+class FanOutLoader:
+    def __init__(
+        self,
+        connection: Connection,
+        chunk_size: typing.Union[int, chunking_utils.ChunkSizer],
+        tables: collections_abc.Sequence[tuple[type, str]],
+        fast_ingest: bool = False,
+    ):
+        self.connection = connection
+        self.sizer = chunking_utils.make_sizer(chunk_size)
+        self.tables = rows_utils.make_ordered_mapping(tables)
+        self.fast_ingest = fast_ingest
+        self.counts = {table_name: 0 for table_name in self.tables.values()}
+        self._getters = {
+            dataclass: rows_utils.make_getter(rows_utils.get_field_names(dataclass)) for dataclass in self.tables
+        }
+        self._stmts = {
+            dataclass: _build_insert_stmt(table_name, rows_utils.get_field_names(dataclass))
+            for dataclass, table_name in self.tables.items()
+        }
+
+    @property
+    def chunk_size(self) -> int:
+        return self.sizer.chunk_size
+
+    def _flush(self, cursor: sqlite3.Cursor, buffers: dict[type, list[typing.Any]]) -> None:
+        start = time.perf_counter()
+        rows_count = 0
+        bytes_count = 0
+        cursor.execute("BEGIN")
+        try:
+            for dataclass in self.tables:
+                data = list(map(self._getters[dataclass], buffers[dataclass]))
+                if data:
+                    cursor.executemany(self._stmts[dataclass], data)
+                    rows_count += len(data)
+                    bytes_count += chunking_utils.estimate_size(data)
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+        for dataclass, table_name in self.tables.items():
+            self.counts[table_name] += len(buffers[dataclass])
+            buffers[dataclass].clear()
+        self.sizer.record(rows_count, time.perf_counter() - start, bytes_count)
+
+    def load_from_iterable(self, items: collections_abc.Iterable[typing.Any]) -> None:
+        buffers: dict[type, list[typing.Any]] = {dataclass: [] for dataclass in self.tables}
+        buffered = 0
+        with _ingest_profile(self.connection, self.fast_ingest):
+            cursor = self.connection.cursor()
+            try:
+                for item in items:
+                    buffer = buffers.get(type(item))
+                    if buffer is None:
+                        try:
+                            buffer = buffers[type(item)] = rows_utils.find_by_mro(buffers, type(item))
+                        except ValueError:
+                            raise TypeError(f"no table for {type(item).__name__}") from None
+                    buffer.append(item)
+                    buffered += 1
+                    if buffered >= self.chunk_size:
+                        self._flush(cursor, buffers)
+                        buffered = 0
+                if buffered:
+                    self._flush(cursor, buffers)
+            finally:
+                cursor.close()
@@ -0,0 +1,45 @@
+import collections.abc as collections_abc
+import contextlib
+import sqlite3
+
+import utils.pool as pool_utils
+
+from .connection import Connection, DbSettings
+
+
+def _check(connection: Connection) -> bool:
+    try:
+        connection.execute("SELECT 1").fetchone()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+def _reset(connection: Connection) -> None:
+    connection.rollback()
+
+
+def _close(connection: Connection) -> None:
+    connection.close()
+
+
+@contextlib.contextmanager
+def open_pool(
+    settings: DbSettings,
+    min_size: int,
+    max_size: int,
+    max_idle_time: float = 600.0,
+) -> collections_abc.Iterator[pool_utils.Pool[Connection]]:
+    pool = pool_utils.Pool(
+        connect=lambda: sqlite3.connect(**settings, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False),
+        check=_check,
+        reset=_reset,
+        close=_close,
+        min_size=min_size,
+        max_size=max_size,
+        max_idle_time=max_idle_time,
+    )
+    try:
+        yield pool
+    finally:
+        pool.close()
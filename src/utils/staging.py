@@ -0,0 +1,288 @@
+import array
+import collections.abc as collections_abc
+import functools
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import typing
+
+import utils.rows as rows_utils
+
+T = typing.TypeVar("T")
+
+MAGIC = b"ETLSTG01"
+VERSION = 1
+_MAGIC_SIZE = len(MAGIC)
+
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_FLOAT = 4
+_TAG_STR = 5
+_TAG_BYTES = 6
+_TAG_PICKLE = 7
+
+_LENGTH = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+_FOOTER = struct.Struct(f"<QQ{_MAGIC_SIZE}s")
+_INT_MIN = -(2**63)
+_INT_MAX = 2**63 - 1
+_FIELD_FORMATS = {
+    _TAG_NONE: "",
+    _TAG_FALSE: "",
+    _TAG_TRUE: "",
+    _TAG_INT: "q",
+    _TAG_FLOAT: "d",
+    _TAG_STR: "I",
+    _TAG_BYTES: "I",
+    _TAG_PICKLE: "I",
+}
+_CONSTANTS = {_TAG_NONE: None, _TAG_FALSE: False, _TAG_TRUE: True}
+_VARIABLE_TAGS = frozenset([_TAG_STR, _TAG_BYTES, _TAG_PICKLE])
+
+
+@functools.lru_cache(maxsize=1024)
+def _layout(tags: bytes) -> struct.Struct:
+    try:
+        return struct.Struct("<" + "".join(_FIELD_FORMATS[tag] for tag in tags))
+    except KeyError:
+        raise ValueError from None
+
+
+def encode_record(values: collections_abc.Iterable[typing.Any]) -> bytes:
+    tags = bytearray()
+    fixed: list[typing.Any] = []
+    variable: list[bytes] = []
+    for value in values:
+        if value is None:
+            tags.append(_TAG_NONE)
+        elif isinstance(value, bool):
+            tags.append(_TAG_TRUE if value else _TAG_FALSE)
+        elif isinstance(value, int) and _INT_MIN <= value <= _INT_MAX:
+            tags.append(_TAG_INT)
+            fixed.append(value)
+        elif isinstance(value, float):
+            tags.append(_TAG_FLOAT)
+            fixed.append(value)
+        else:
+            if isinstance(value, str):
+                tags.append(_TAG_STR)
+                data = value.encode()
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                tags.append(_TAG_BYTES)
+                data = bytes(value)
+            else:
+                tags.append(_TAG_PICKLE)
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            fixed.append(len(data))
+            variable.append(data)
+    payload = b"".join([tags, _layout(bytes(tags)).pack(*fixed), *variable])
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _decode_variable(tag: int, data: memoryview) -> typing.Any:
+    if tag == _TAG_STR:
+        return str(data, "utf-8")
+    if tag == _TAG_BYTES:
+        return bytes(data)
+    return pickle.loads(data)
+
+
+def decode_record(buffer: memoryview, fields_count: int) -> tuple[typing.Any, ...]:
+    tags = bytes(buffer[:fields_count])
+    layout = _layout(tags)
+    fixed = layout.unpack_from(buffer, fields_count)
+    offset = fields_count + layout.size
+    values = []
+    position = 0
+    for tag in tags:
+        if tag in _CONSTANTS:
+            values.append(_CONSTANTS[tag])
+            continue
+        value = fixed[position]
+        position += 1
+        if tag in _VARIABLE_TAGS:
+            end = offset + value
+            value = _decode_variable(tag, buffer[offset:end])
+            offset = end
+        values.append(value)
+    return tuple(values)
+
+
+class StagedRecord:
+    __slots__ = ("_buffer", "_tags", "_fields")
+
+    def __init__(self, buffer: memoryview, fields_count: int):
+        self._buffer = buffer
+        self._tags = bytes(buffer[:fields_count])
+        layout = _layout(self._tags)
+        fixed = iter(layout.unpack_from(buffer, fields_count))
+        offset = fields_count + layout.size
+        fields: list[typing.Any] = []
+        for tag in self._tags:
+            if tag in _CONSTANTS:
+                fields.append(_CONSTANTS[tag])
+            elif tag in _VARIABLE_TAGS:
+                end = offset + next(fixed)
+                fields.append((offset, end))
+                offset = end
+            else:
+                fields.append(next(fixed))
+        self._fields = fields
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def __getitem__(self, index: int) -> typing.Any:
+        tag = self._tags[index]
+        if tag in _VARIABLE_TAGS:
+            start, end = self._fields[index]
+            return _decode_variable(tag, self._buffer[start:end])
+        return self._fields[index]
+
+    def __iter__(self) -> collections_abc.Iterator[typing.Any]:
+        for index in range(len(self._tags)):
+            yield self[index]
+
+    def raw(self, index: int) -> memoryview:
+        if self._tags[index] not in _VARIABLE_TAGS:
+            raise ValueError
+        start, end = self._fields[index]
+        return self._buffer[start:end]
+
+    def to_tuple(self) -> tuple[typing.Any, ...]:
+        return tuple(self)
+
+
+class StagingWriter:
+    def __init__(self, path: str, dataclass: type):
+        self.path = path
+        self.field_names = rows_utils.get_field_names(dataclass)
+        self._getter = rows_utils.make_getter(self.field_names)
+        self._file = open(path, "wb")
+        self._offsets = array.array("Q")
+        header = json.dumps({"version": VERSION, "fields": self.field_names}).encode()
+        self._file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        self._position = _MAGIC_SIZE + _LENGTH.size + len(header)
+
+    def __enter__(self) -> "StagingWriter":
+        return self
+
+    def __exit__(self, exc_type: typing.Optional[type[BaseException]], *args: typing.Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    @property
+    def count(self) -> int:
+        return len(self._offsets)
+
+    def write(self, row: typing.Any) -> None:
+        record = encode_record(self._getter(row))
+        self._offsets.append(self._position)
+        self._file.write(record)
+        self._position += len(record)
+
+    def write_many(self, rows: collections_abc.Iterable[typing.Any]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array.array("Q", offsets)
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.write(_FOOTER.pack(self._position, len(self._offsets), MAGIC))
+        self._file.close()
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class StagingReader:
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        if len(self._buffer) < _MAGIC_SIZE + _FOOTER.size or self._mmap[:_MAGIC_SIZE] != MAGIC:
+            raise ValueError
+        index_offset, count, magic = _FOOTER.unpack_from(self._buffer, len(self._buffer) - _FOOTER.size)
+        if magic != MAGIC or index_offset + count * _OFFSET.size + _FOOTER.size != len(self._buffer):
+            raise ValueError
+
+        (header_length,) = _LENGTH.unpack_from(self._buffer, _MAGIC_SIZE)
+        header_start = _MAGIC_SIZE + _LENGTH.size
+        header_end = header_start + header_length
+        header = json.loads(bytes(self._buffer[header_start:header_end]))
+        if header["version"] != VERSION:
+            raise ValueError
+        self.field_names: tuple[str, ...] = tuple(header["fields"])
+        self._index_offset: int = index_offset
+        self._count: int = count
+
+    def __enter__(self) -> "StagingReader":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._buffer.release()
+        self._mmap.close()
+
+    def _record_buffer(self, index: int) -> memoryview:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        (offset,) = _OFFSET.unpack_from(self._buffer, self._index_offset + index * _OFFSET.size)
+        start = offset + _LENGTH.size
+        if start > self._index_offset:
+            raise ValueError
+        (length,) = _LENGTH.unpack_from(self._buffer, offset)
+        end = start + length
+        if end > self._index_offset:
+            raise ValueError
+        return self._buffer[start:end]
+
+    def record(self, index: int) -> StagedRecord:
+        return StagedRecord(self._record_buffer(index), len(self.field_names))
+
+    def records(self, start: int = 0, stop: typing.Optional[int] = None) -> collections_abc.Iterator[StagedRecord]:
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self.record(index)
+
+    def tuples(
+        self, start: int = 0, stop: typing.Optional[int] = None
+    ) -> collections_abc.Iterator[tuple[typing.Any, ...]]:
+        fields_count = len(self.field_names)
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield decode_record(self._record_buffer(index), fields_count)
+
+    def rows(
+        self, target: typing.Type[T], start: int = 0, stop: typing.Optional[int] = None
+    ) -> collections_abc.Iterator[T]:
+        return rows_utils.make_row_mapper(target, self.field_names)(self.tuples(start, stop))
+
+
+__all__ = [
+    "encode_record",
+    "decode_record",
+    "StagedRecord",
+    "StagingReader",
+    "StagingWriter",
+]
@@ -0,0 +1,169 @@
+import collections.abc as collections_abc
+import concurrent.futures
+import dataclasses
+import functools
+import itertools
+import random
+import typing
+
+import faker
+
+import utils.pipeline as pipeline_utils
+import utils.rows as rows_utils
+
+T = typing.TypeVar("T")
+
+POOL_SIZE = 10_000
+BLOCK_SIZE = 10_000
+USER_DESCRIPTION_LENGTHS = (5, 200)
+
+
+class Column(typing.Protocol):
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[typing.Any]:
+        ...
+
+
+@dataclasses.dataclass(frozen=True)
+class Sequence:
+    start: int = 0
+    step: int = 1
+
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[int]:
+        first = self.start + start * self.step
+        return list(range(first, first + count * self.step, self.step))
+
+
+@dataclasses.dataclass(frozen=True)
+class Choice:
+    values: tuple[typing.Any, ...]
+
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[typing.Any]:
+        return rand.choices(self.values, k=count)
+
+
+@dataclasses.dataclass(frozen=True)
+class UniformInt:
+    low: int
+    high: int
+
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[int]:
+        return rand.choices(range(self.low, self.high), k=count)
+
+
+@dataclasses.dataclass(frozen=True)
+class Zipf:
+    count: int
+    exponent: float = 1.1
+    offset: int = 0
+
+    @functools.cached_property
+    def _cum_weights(self) -> list[float]:
+        return list(itertools.accumulate(1 / rank**self.exponent for rank in range(1, self.count + 1)))
+
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[int]:
+        return rand.choices(range(self.offset, self.offset + self.count), cum_weights=self._cum_weights, k=count)
+
+
+@dataclasses.dataclass(frozen=True)
+class Format:
+    template: str
+    column: Column
+
+    def __call__(self, rand: random.Random, start: int, count: int) -> list[str]:
+        return [self.template.format(value) for value in self.column(rand, start, count)]
+
+
+def _make_faker(seed: int) -> faker.Faker:
+    fake = faker.Faker()
+    fake.seed_instance(seed)
+    return fake
+
+
+def build_pool(factory: collections_abc.Callable[[faker.Faker], T], seed: int, size: int = POOL_SIZE) -> tuple[T, ...]:
+    fake = _make_faker(seed)
+    return tuple(factory(fake) for _ in range(size))
+
+
+def build_text_pool(seed: int, min_length: int, max_length: int, size: int = POOL_SIZE) -> tuple[str, ...]:
+    if not 0 <= min_length <= max_length:
+        raise ValueError
+    fake = _make_faker(seed)
+    rand = random.Random(seed)
+    paragraphs = [fake.paragraph(nb_sentences=10) for _ in range(100)]
+    corpus = " ".join(paragraphs)
+    while len(corpus) < 2 * max_length:
+        corpus += " " + corpus
+    lengths = [rand.randint(min_length, max_length) for _ in range(size)]
+    starts = [rand.randrange(len(corpus) - length + 1) for length in lengths]
+    return tuple(corpus[start:end] for start, end in zip(starts, map(sum, zip(starts, lengths))))
+
+
+@functools.lru_cache(maxsize=8)
+def get_user_columns(seed: int) -> dict[str, Column]:
+    return {
+        "name": Choice(build_pool(lambda fake: fake.name(), seed)),
+        "description": Choice(build_text_pool(seed, *USER_DESCRIPTION_LENGTHS)),
+    }
+
+
+def _generate_chunk(
+    field_names: tuple[str, ...], columns: collections_abc.Mapping[str, Column], seed: int, span: tuple[int, int]
+) -> list[tuple[typing.Any, ...]]:
+    start, count = span
+    return list(zip(*[columns[name](random.Random(f"{seed}:{start}:{name}"), start, count) for name in field_names]))
+
+
+_worker_generate_chunk: typing.Optional[
+    collections_abc.Callable[[tuple[int, int]], list[tuple[typing.Any, ...]]]
+] = None
+
+
+def _init_worker(field_names: tuple[str, ...], columns: collections_abc.Mapping[str, Column], seed: int) -> None:
+    global _worker_generate_chunk
+    _worker_generate_chunk = functools.partial(_generate_chunk, field_names, columns, seed)
+
+
+def _generate_worker_chunk(span: tuple[int, int]) -> list[tuple[typing.Any, ...]]:
+    if _worker_generate_chunk is None:
+        raise RuntimeError
+    return _worker_generate_chunk(span)
+
+
+def generate_rows(
+    target: typing.Type[T],
+    columns: collections_abc.Mapping[str, Column],
+    count: int,
+    seed: int = 0,
+    max_workers: typing.Optional[int] = None,
+) -> collections_abc.Iterator[T]:
+    field_names = rows_utils.get_field_names(target)
+    if set(columns) != set(field_names):
+        raise ValueError
+    row_mapper = rows_utils.make_row_mapper(target, field_names)
+    spans = [(start, min(BLOCK_SIZE, count - start)) for start in range(0, count, BLOCK_SIZE)]
+    if max_workers is None:
+        for span in spans:
+            yield from row_mapper(_generate_chunk(field_names, columns, seed, span))
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(field_names, columns, seed)
+    ) as executor:
+        for chunk in pipeline_utils.process_map(
+            _generate_worker_chunk, spans, chunk_size=1, max_workers=max_workers, executor=executor
+        ):
+            yield from row_mapper(chunk)
+
+
+__all__ = [
+    "Column",
+    "Sequence",
+    "Choice",
+    "UniformInt",
+    "Zipf",
+    "Format",
+    "build_pool",
+    "build_text_pool",
+    "get_user_columns",
+    "generate_rows",
+]
@@ -0,0 +1,22 @@
+import collections.abc as collections_abc
+import contextlib
+import unittest
+
+import psycopg2
+
+import settings
+import utils.psycopg2 as psycopg2_utils
+
+CONNECT_TIMEOUT = 2
+
+
+@contextlib.contextmanager
+def open_test_connection() -> collections_abc.Iterator[psycopg2_utils.Connection]:
+    try:
+        connection = psycopg2.connect(**settings.POSTGRESQL_DATABASE_SETTINGS, connect_timeout=CONNECT_TIMEOUT)
+    except psycopg2.OperationalError as e:
+        raise unittest.SkipTest(f"postgresql is not available: {e}")
+    try:
+        yield connection
+    finally:
+        connection.close()
@@ -0,0 +1,130 @@
+import asyncio
+import collections.abc as collections_abc
+import dataclasses
+import os
+import tempfile
+import typing
+import unittest
+
+import utils.aio as aio_utils
+import utils.sqlite3 as sqlite3_utils
+
+TIMEOUT = 5.0
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+    name: str
+
+
+async def gen_users(count: int) -> collections_abc.AsyncIterator[User]:
+    for i in range(count):
+        yield User(id=i, name=f"user {i}")
+        await asyncio.sleep(0)
+
+
+async def gen_forever(produced: list[int]) -> collections_abc.AsyncIterator[int]:
+    i = 0
+    while True:
+        produced.append(i)
+        yield i
+        i += 1
+        await asyncio.sleep(0)
+
+
+class RunAsyncPipelineTest(unittest.IsolatedAsyncioTestCase):
+    async def test_sink_returning_early_cancels_upstream(self) -> None:
+        produced: list[int] = []
+        consumed: list[int] = []
+
+        async def sink(items: collections_abc.AsyncIterable[typing.Any]) -> None:
+            async for item in items:
+                consumed.append(item)
+                if len(consumed) == 10:
+                    return
+
+        await asyncio.wait_for(
+            aio_utils.run_async_pipeline(
+                gen_forever(produced),
+                [lambda items: aio_utils.amap(lambda item: item * 2, items)],
+                sink,
+                chunk_size=3,
+                queue_size=2,
+            ),
+            TIMEOUT,
+        )
+        self.assertEqual(consumed, [i * 2 for i in range(10)])
+        produced_count = len(produced)
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(produced), produced_count)
+
+    async def test_stage_error_is_raised(self) -> None:
+        def fail(item: int) -> int:
+            raise ZeroDivisionError
+
+        async def sink(items: collections_abc.AsyncIterable[typing.Any]) -> None:
+            async for _ in items:
+                ...
+
+        with self.assertRaises(ZeroDivisionError):
+            await asyncio.wait_for(
+                aio_utils.run_async_pipeline(
+                    gen_forever([]), [lambda items: aio_utils.amap(fail, items)], sink, queue_size=1
+                ),
+                TIMEOUT,
+            )
+
+
+class AsyncLoaderTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings: sqlite3_utils.DbSettings = {"database": os.path.join(directory.name, "test.sqlite3")}
+        with sqlite3_utils.open_connection(self.settings) as connection:
+            connection.execute("CREATE TABLE users(id integer primary key, name text NOT NULL)")
+            connection.commit()
+
+    def count_users(self) -> int:
+        with sqlite3_utils.open_connection(self.settings) as connection:
+            (count,) = connection.execute("SELECT count(*) FROM users").fetchone()
+        return int(count)
+
+    async def test_loads_all_rows(self) -> None:
+        with sqlite3_utils.open_pool(self.settings, min_size=0, max_size=2) as pool:
+            loader = aio_utils.AsyncLoader(pool, sqlite3_utils.Loader, chunk_size=7, concurrency=2)
+            await asyncio.wait_for(loader.load_from_async_iterable(gen_users(100), User, "users"), TIMEOUT)
+        self.assertEqual(self.count_users(), 100)
+
+    async def test_early_exit_in_pipeline_sink(self) -> None:
+        produced: list[int] = []
+
+        async def gen_users_forever() -> collections_abc.AsyncIterator[User]:
+            async for i in gen_forever(produced):
+                yield User(id=i, name=f"user {i}")
+
+        async def take(items: collections_abc.AsyncIterable[User], count: int) -> collections_abc.AsyncIterator[User]:
+            taken = 0
+            async for item in items:
+                yield item
+                taken += 1
+                if taken == count:
+                    return
+
+        with sqlite3_utils.open_pool(self.settings, min_size=0, max_size=2) as pool:
+            loader = aio_utils.AsyncLoader(pool, sqlite3_utils.Loader, chunk_size=10, concurrency=2)
+
+            async def sink(items: collections_abc.AsyncIterable[User]) -> None:
+                await loader.load_from_async_iterable(take(items, 25), User, "users")
+
+            await asyncio.wait_for(
+                aio_utils.run_async_pipeline(gen_users_forever(), [], sink, chunk_size=10, queue_size=2), TIMEOUT
+            )
+        self.assertEqual(self.count_users(), 25)
+        produced_count = len(produced)
+        await asyncio.sleep(0.01)
+        self.assertEqual(len(produced), produced_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import collections.abc as collections_abc
+import dataclasses
+import datetime
+import decimal
+import unittest
+import uuid
+
+import utils.change_detection as change_detection_utils
+import utils.sqlite3 as sqlite3_utils
+
+CHUNK_SIZE = 10
+
+
+@dataclasses.dataclass
+class Snapshot:
+    id: int
+    value: str
+
+
+class LoadError(Exception):
+    pass
+
+
+def fail_after(items: collections_abc.Iterable[Snapshot], count: int) -> collections_abc.Iterator[Snapshot]:
+    for i, item in enumerate(items):
+        if i == count:
+            raise LoadError
+        yield item
+
+
+class ChangeDetectorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3_utils.Connection(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute("CREATE TABLE snapshots(id integer NOT NULL, value text NOT NULL)")
+        self.connection.commit()
+
+    def load(self, snapshots: collections_abc.Iterable[Snapshot]) -> change_detection_utils.ChangeStats:
+        detector = change_detection_utils.ChangeDetector(
+            sqlite3_utils.HashIndex(self.connection, "snapshots"), Snapshot, key=["id"], chunk_size=CHUNK_SIZE
+        )
+        loader = sqlite3_utils.Loader(self.connection, CHUNK_SIZE)
+        try:
+            loader.load_from_iterable(
+                detector.filter_changed(snapshots), Snapshot, "snapshots", on_chunk=detector.save_chunk
+            )
+        finally:
+            self.assertLessEqual(len(detector._pending), CHUNK_SIZE)
+        return detector.stats
+
+    def count_rows(self) -> int:
+        (count,) = self.connection.execute("SELECT count(*) FROM snapshots").fetchone()
+        return int(count)
+
+    def test_replay_loads_only_changed_rows(self) -> None:
+        snapshots = [Snapshot(id=i, value=str(i)) for i in range(100)]
+        self.assertEqual(self.load(snapshots).new, 100)
+
+        snapshots[5].value = "changed"
+        stats = self.load([*snapshots, Snapshot(id=100, value="new")])
+        self.assertEqual((stats.new, stats.changed, stats.unchanged), (1, 1, 99))
+        self.assertEqual(self.count_rows(), 102)
+
+    def test_rerun_after_failure_does_not_duplicate_rows(self) -> None:
+        snapshots = [Snapshot(id=i, value=str(i)) for i in range(100)]
+        with self.assertRaises(LoadError):
+            self.load(fail_after(snapshots, 35))
+        self.assertEqual(self.count_rows(), 30)
+
+        stats = self.load(snapshots)
+        self.assertEqual((stats.new, stats.unchanged), (70, 30))
+        self.assertEqual(self.count_rows(), 100)
+
+    def test_duplicate_keys_across_chunks(self) -> None:
+        snapshots = [Snapshot(id=i % 15, value=str(i % 15)) for i in range(45)]
+        stats = self.load(snapshots)
+        self.assertEqual((stats.new, stats.unchanged), (15, 30))
+        self.assertEqual(self.count_rows(), 15)
+
+
+class EncodeValuesTest(unittest.TestCase):
+    def test_equal_values_encode_equally(self) -> None:
+        first = {"b": [1, 2], "a": {"y": None, "x": frozenset({"q", "p"})}}
+        second = {"a": {"x": frozenset({"p", "q"}), "y": None}, "b": [1, 2]}
+        self.assertEqual(
+            change_detection_utils.encode_values((first, {3, 1, 2})),
+            change_detection_utils.encode_values((second, {2, 3, 1})),
+        )
+
+    def test_distinct_values_encode_differently(self) -> None:
+        values = [
+            ("ab",),
+            ("a", "b"),
+            (1,),
+            ("1",),
+            (1.0,),
+            (True,),
+            (None,),
+            (b"1",),
+            (decimal.Decimal("1"),),
+            (datetime.date(2024, 1, 2),),
+            (datetime.datetime(2024, 1, 2),),
+            (uuid.UUID(int=1),),
+            ([1, 2],),
+            ([[1], 2],),
+        ]
+        self.assertEqual(len({change_detection_utils.encode_values(value) for value in values}), len(values))
+
+    def test_unsupported_value(self) -> None:
+        with self.assertRaises(ValueError):
+            change_detection_utils.encode_values((object(),))
+
+
+if __name__ == "__main__":
+    unittest.main()
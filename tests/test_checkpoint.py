@@ -0,0 +1,67 @@
+import dataclasses
+import datetime
+import decimal
+import unittest
+import uuid
+
+import utils.sqlite3 as sqlite3_utils
+import utils.sqlite3.checkpoint as checkpoint_utils
+
+SOURCE = "postgresql.events"
+JOB = "events_to_sqlite"
+
+
+@dataclasses.dataclass
+class Event:
+    created_at: datetime.datetime
+    id: uuid.UUID
+
+
+class CheckpointStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3_utils.Connection(":memory:")
+        self.addCleanup(self.connection.close)
+        self.store = sqlite3_utils.CheckpointStore(self.connection)
+
+    def test_key_round_trip(self) -> None:
+        key = (
+            None,
+            True,
+            42,
+            1.5,
+            "text",
+            datetime.datetime(2024, 1, 2, 3, 4, 5, 6, tzinfo=datetime.timezone.utc),
+            datetime.date(2024, 1, 2),
+            datetime.time(3, 4, 5),
+            decimal.Decimal("12.3400"),
+            uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            b"\x00\xff",
+        )
+        self.store.save(SOURCE, JOB, key)
+        loaded = self.store.load(SOURCE, JOB)
+        self.assertEqual(loaded, key)
+        assert loaded is not None
+        self.assertEqual([type(value) for value in loaded], [type(value) for value in key])
+
+    def test_unsupported_key_type(self) -> None:
+        with self.assertRaises(ValueError):
+            checkpoint_utils.encode_key([object()])
+
+    def test_track_saves_last_key_of_chunk(self) -> None:
+        events = [Event(created_at=datetime.datetime(2024, 1, day), id=uuid.UUID(int=day)) for day in range(1, 4)]
+        on_chunk = self.store.track(SOURCE, JOB, ["created_at", "id"])
+        on_chunk(events)
+        self.connection.commit()
+        self.assertEqual(self.store.load(SOURCE, JOB), (events[-1].created_at, events[-1].id))
+
+    def test_refuses_open_transaction(self) -> None:
+        self.connection.execute("CREATE TABLE events(id integer)")
+        self.connection.execute("INSERT INTO events VALUES (1)")
+        with self.assertRaises(ValueError):
+            sqlite3_utils.CheckpointStore(self.connection, "other_checkpoints")
+        self.connection.rollback()
+        self.assertEqual(self.connection.execute("SELECT count(*) FROM events").fetchone(), (0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import dataclasses
+import unittest
+
+import utils.columnar as columnar_utils
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+    age: int
+    name: str
+
+
+USERS = [User(id=i, age=i % 90, name=f"user {i}") for i in range(200)]
+
+
+class ColumnarBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.batch = columnar_utils.ColumnarBatch.from_rows(USERS, User, typecodes={"id": "q", "age": "b"})
+
+    def test_where_matches_row_filter(self) -> None:
+        batch = self.batch.where("age", ">=", 30)
+        self.assertEqual(batch["id"].typecode, "q")  # type: ignore[union-attr]
+        self.assertEqual(list(batch.to_rows(User)), [user for user in USERS if user.age >= 30])
+
+    def test_combined_masks(self) -> None:
+        odd = columnar_utils.compare(columnar_utils.compute(self.batch["id"], "%", 2), "!=", 0)
+        young = columnar_utils.compare(self.batch["age"], "<", 30)
+        mask = columnar_utils.compare(odd, "&", columnar_utils.invert(young))
+        self.assertEqual(
+            list(self.batch.compress(mask).to_rows(User)),
+            [user for user in USERS if user.id % 2 and user.age >= 30],
+        )
+
+    def test_column_operands(self) -> None:
+        total = columnar_utils.compute(self.batch["id"], "+", self.batch["age"])
+        self.assertEqual(list(total), [user.id + user.age for user in USERS])
+        with self.assertRaises(ValueError):
+            columnar_utils.compute(self.batch["id"], "+", [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
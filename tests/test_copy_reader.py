@@ -0,0 +1,76 @@
+import datetime
+import decimal
+import unittest
+
+import postgres
+
+import utils.psycopg2 as psycopg2_utils
+import utils.psycopg2.copy_reader as copy_reader_utils
+
+
+class EncodeValueTest(unittest.TestCase):
+    def test_escapes(self) -> None:
+        self.assertEqual(copy_reader_utils.encode_value("a\tb\nc\rd\\e\bf\fg\vh"), "a\\tb\\nc\\rd\\\\e\\bf\\fg\\vh")
+        self.assertEqual(copy_reader_utils.encode_value("\\N"), "\\\\N")
+
+    def test_scalars(self) -> None:
+        self.assertEqual(copy_reader_utils.encode_value(None), "\\N")
+        self.assertEqual(copy_reader_utils.encode_value(True), "t")
+        self.assertEqual(copy_reader_utils.encode_value(False), "f")
+        self.assertEqual(copy_reader_utils.encode_value(0), "0")
+        self.assertEqual(copy_reader_utils.encode_value(decimal.Decimal("1.50")), "1.50")
+        self.assertEqual(copy_reader_utils.encode_value(datetime.date(2024, 1, 2)), "2024-01-02")
+        self.assertEqual(copy_reader_utils.encode_value(b"\x00\xff"), "\\\\x00ff")
+        self.assertEqual(copy_reader_utils.encode_value(memoryview(b"\x01")), "\\\\x01")
+
+    def test_containers_are_rejected(self) -> None:
+        for value in [[1], (1,), {"a": 1}, {1}, frozenset()]:
+            with self.subTest(value=value), self.assertRaises(TypeError):
+                copy_reader_utils.encode_value(value)
+
+    def test_encode_row(self) -> None:
+        self.assertEqual(copy_reader_utils.encode_row([1, None, "é\t"]), "1\t\\N\té\\t\n".encode())
+
+
+class CopyReaderTest(unittest.TestCase):
+    rows = [(1, "a"), (2, "b\nc"), (3, None)]
+    data = b"1\ta\n2\tb\\nc\n3\t\\N\n"
+
+    def test_read(self) -> None:
+        reader = psycopg2_utils.CopyReader(self.rows)
+        self.assertEqual(reader.read(), self.data)
+        self.assertEqual(reader.read(), b"")
+        self.assertEqual((reader.rows_count, reader.bytes_count), (3, len(self.data)))
+
+    def test_read_in_pieces(self) -> None:
+        reader = psycopg2_utils.CopyReader(self.rows)
+        pieces = list(iter(lambda: reader.read(5), b""))
+        self.assertEqual(b"".join(pieces), self.data)
+        self.assertTrue(all(len(piece) <= 5 for piece in pieces))
+
+    def test_readline(self) -> None:
+        reader = psycopg2_utils.CopyReader(self.rows)
+        self.assertEqual(reader.readline(3), b"1\ta")
+        self.assertEqual(list(iter(reader.readline, b"")), [b"\n", b"2\tb\\nc\n", b"3\t\\N\n"])
+
+
+class CopyIntegrationTest(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        rows = [
+            (1, "tab\there", b"\x00\\\n", True),
+            (2, "line\nbreak\r\\N", None, False),
+            (3, None, b"", None),
+        ]
+        with postgres.open_test_connection() as connection, connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE copy_values(id integer, text_value text, data bytea, flag boolean)")
+            cursor.copy_expert("COPY copy_values FROM STDIN", psycopg2_utils.CopyReader(rows))
+            cursor.execute("SELECT id, text_value, data, flag FROM copy_values ORDER BY id")
+            loaded = [
+                (id, text_value, None if data is None else bytes(data), flag) for id, text_value, data, flag in cursor
+            ]
+            connection.rollback()
+        self.assertEqual(loaded, rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
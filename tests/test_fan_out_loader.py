@@ -0,0 +1,71 @@
+import collections.abc as collections_abc
+import dataclasses
+import sqlite3
+import typing
+import unittest
+
+import utils.sqlite3 as sqlite3_utils
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+
+
+@dataclasses.dataclass
+class Email:
+    user_id: int
+    email: str
+
+
+@dataclasses.dataclass
+class VerifiedEmail(Email):
+    pass
+
+
+def gen_rows(count: int) -> collections_abc.Iterator[typing.Union[User, Email]]:
+    for i in range(count):
+        yield User(id=i)
+        yield Email(user_id=i, email=f"user{i}@example.com")
+        yield VerifiedEmail(user_id=i, email=f"user{i}@example.org")
+
+
+class FanOutLoaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3_utils.Connection(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("CREATE TABLE users(id integer primary key)")
+        self.connection.execute(
+            "CREATE TABLE emails(user_id integer NOT NULL REFERENCES users(id), email text NOT NULL)"
+        )
+        self.connection.commit()
+
+    def count(self, table_name: str) -> int:
+        (count,) = self.connection.execute(f"SELECT count(*) FROM {table_name}").fetchone()
+        return int(count)
+
+    def test_parents_are_flushed_first_and_subclasses_are_routed(self) -> None:
+        loader = sqlite3_utils.FanOutLoader(self.connection, 4, tables=[(User, "users"), (Email, "emails")])
+        loader.load_from_iterable(gen_rows(10))
+        self.assertEqual(loader.counts, {"users": 10, "emails": 20})
+        self.assertEqual((self.count("users"), self.count("emails")), (10, 20))
+
+    def test_children_first_order_rolls_back_chunk(self) -> None:
+        loader = sqlite3_utils.FanOutLoader(self.connection, 4, tables=[(Email, "emails"), (User, "users")])
+        with self.assertRaises(sqlite3.IntegrityError):
+            loader.load_from_iterable(gen_rows(10))
+        self.assertEqual((self.count("users"), self.count("emails")), (0, 0))
+
+    def test_duplicate_types_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            sqlite3_utils.FanOutLoader(self.connection, 4, tables=[(User, "users"), (User, "emails")])
+
+    def test_unknown_type_is_rejected(self) -> None:
+        loader = sqlite3_utils.FanOutLoader(self.connection, 4, tables=[(User, "users")])
+        with self.assertRaisesRegex(TypeError, "Email"):
+            loader.load_from_iterable([User(id=1), Email(user_id=1, email="")])
+
+
+if __name__ == "__main__":
+    unittest.main()
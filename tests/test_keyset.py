@@ -0,0 +1,74 @@
+import dataclasses
+import typing
+import unittest
+
+import utils.chunking as chunking_utils
+import utils.keyset as keyset_utils
+import utils.sqlite3 as sqlite3_utils
+
+
+@dataclasses.dataclass
+class Event:
+    id: int
+    group_id: int
+
+
+class BuildQueryTest(unittest.TestCase):
+    def test_placeholder_styles(self) -> None:
+        for placeholder in ["%s", "?"]:
+            with self.subTest(placeholder=placeholder):
+                query = keyset_utils.build_query(("id", "name"), "users", ["group_id", "id"], placeholder, lower=1)
+                p = placeholder
+                self.assertEqual(query.columns, ("id", "name", "group_id"))
+                self.assertEqual(query.key_indexes, [2, 0])
+                self.assertEqual(query.range_data, [1])
+                self.assertEqual(
+                    query.first_page_stmt,
+                    f"SELECT id, name, group_id FROM users WHERE group_id >= {p} ORDER BY group_id, id LIMIT {p}",
+                )
+                self.assertEqual(
+                    query.next_page_stmt,
+                    f"SELECT id, name, group_id FROM users WHERE group_id >= {p} AND (group_id, id) > ({p}, {p})"
+                    f" ORDER BY group_id, id LIMIT {p}",
+                )
+
+    def test_empty_key(self) -> None:
+        with self.assertRaises(ValueError):
+            keyset_utils.build_query(("id",), "users", [], "?")
+
+
+class IterPagesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3_utils.Connection(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute("CREATE TABLE events(id integer PRIMARY KEY, group_id integer NOT NULL)")
+        self.connection.executemany("INSERT INTO events VALUES (?, ?)", [(i, i // 3) for i in range(20)])
+        self.connection.commit()
+        self.statements: list[str] = []
+
+    def execute(self, stmt: str, data: tuple[typing.Any, ...]) -> keyset_utils.Rows:
+        self.statements.append(stmt)
+        return self.connection.execute(stmt, data).fetchall()
+
+    def test_pages_and_resume(self) -> None:
+        query = keyset_utils.build_query(("group_id",), "events", ["id"], "?")
+        pages = list(keyset_utils.iter_pages(self.execute, query, chunking_utils.ChunkSizer(5), after=[9]))
+        self.assertEqual(pages, [[(i // 3,) for i in range(10, 15)], [(i // 3,) for i in range(15, 20)]])
+        self.assertEqual(len(self.statements), 2)
+
+    def test_non_unique_key_is_rejected(self) -> None:
+        query = keyset_utils.build_query(("id", "group_id"), "events", ["group_id"], "?")
+        with self.assertRaises(ValueError):
+            list(keyset_utils.iter_pages(self.execute, query, chunking_utils.ChunkSizer(4)))
+
+    def test_sqlite_extractor_rowid(self) -> None:
+        extractor = sqlite3_utils.Extractor(self.connection, 4)
+        self.assertEqual(
+            [event.id for event in extractor.extract_with_rowid(Event, "events", after=3)], list(range(4, 20))
+        )
+        with self.assertRaises(ValueError):
+            list(extractor.extract_with_keyset(Event, "events", key=["group_id"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
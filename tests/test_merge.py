@@ -0,0 +1,28 @@
+import operator
+import unittest
+
+import utils.merge as merge_utils
+
+
+def concat(first: tuple[int, str], second: tuple[int, str]) -> tuple[int, str]:
+    return first[0], first[1] + second[1]
+
+
+class MergeSortedTest(unittest.TestCase):
+    def test_merge(self) -> None:
+        self.assertEqual(list(merge_utils.merge_sorted([1, 4], [2, 3, 5], [])), [1, 2, 3, 4, 5])
+
+    def test_combine_only_across_streams(self) -> None:
+        first = [(1, "a"), (1, "b"), (2, "c")]
+        second = [(1, "d"), (3, "e")]
+        third = [(1, "f"), (1, "g")]
+        merged = merge_utils.merge_sorted(first, second, third, key=operator.itemgetter(0), combine=concat)
+        self.assertEqual(list(merged), [(1, "adf"), (1, "bg"), (2, "c"), (3, "e")])
+
+    def test_combine_keeps_duplicates_of_single_stream(self) -> None:
+        merged = merge_utils.merge_sorted([1, 1, 2], key=None, combine=operator.add)
+        self.assertEqual(list(merged), [1, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
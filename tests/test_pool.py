@@ -0,0 +1,112 @@
+import itertools
+import threading
+import time
+import unittest
+
+import utils.pool as pool_utils
+
+MAX_IDLE_TIME = 0.05
+JOIN_TIMEOUT = 1.0
+
+
+class FakeConnection:
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = False
+
+
+class PoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.numbers = itertools.count()
+        self.closed_while_locked: list[bool] = []
+        self.pool: pool_utils.Pool[FakeConnection] = pool_utils.Pool(
+            connect=lambda: FakeConnection(next(self.numbers)),
+            check=lambda connection: not connection.closed,
+            reset=lambda connection: None,
+            close=self.close,
+            min_size=1,
+            max_size=3,
+            max_idle_time=MAX_IDLE_TIME,
+        )
+        self.addCleanup(self.pool.close)
+
+    def close(self, connection: FakeConnection) -> None:
+        def take_lock() -> None:
+            with self.pool._condition:
+                pass
+
+        thread = threading.Thread(target=take_lock)
+        thread.start()
+        thread.join(JOIN_TIMEOUT)
+        self.closed_while_locked.append(thread.is_alive())
+        connection.closed = True
+
+    def test_idle_connections_are_evicted_on_release_outside_lock(self) -> None:
+        connections = [self.pool.acquire() for _ in range(3)]
+        for connection in connections[:2]:
+            self.pool.release(connection)
+        time.sleep(2 * MAX_IDLE_TIME)
+
+        self.pool.release(connections[2])
+        self.assertEqual(self.pool.stats.evicted, 2)
+        self.assertEqual((self.pool.size, self.pool.idle_count), (1, 1))
+        self.assertEqual(self.closed_while_locked, [False, False])
+        self.assertFalse(connections[2].closed)
+
+    def test_eviction_keeps_min_size(self) -> None:
+        connections = [self.pool.acquire() for _ in range(2)]
+        for connection in connections:
+            self.pool.release(connection)
+        time.sleep(2 * MAX_IDLE_TIME)
+
+        self.assertEqual(self.pool.evict_idle(), 1)
+        self.assertEqual(self.pool.evict_idle(), 0)
+        self.assertEqual(self.pool.size, 1)
+
+
+class PoolCheckTest(unittest.TestCase):
+    def test_failed_connect_closes_opened_connections(self) -> None:
+        opened: list[FakeConnection] = []
+
+        def connect() -> FakeConnection:
+            if len(opened) == 2:
+                raise ConnectionError
+            opened.append(FakeConnection(len(opened)))
+            return opened[-1]
+
+        def close(connection: FakeConnection) -> None:
+            connection.closed = True
+
+        with self.assertRaises(ConnectionError):
+            pool_utils.Pool(connect, lambda connection: True, lambda connection: None, close, min_size=3, max_size=3)
+        self.assertEqual([connection.closed for connection in opened], [True, True])
+
+    def test_check_only_after_idle_time(self) -> None:
+        checked: list[int] = []
+
+        def check(connection: FakeConnection) -> bool:
+            checked.append(connection.number)
+            return True
+
+        pool: pool_utils.Pool[FakeConnection] = pool_utils.Pool(
+            connect=lambda: FakeConnection(0),
+            check=check,
+            reset=lambda connection: None,
+            close=lambda connection: None,
+            min_size=1,
+            max_size=1,
+            check_idle_time=MAX_IDLE_TIME,
+        )
+        self.addCleanup(pool.close)
+        with pool.connection():
+            pass
+        self.assertEqual(checked, [])
+
+        time.sleep(2 * MAX_IDLE_TIME)
+        with pool.connection():
+            pass
+        self.assertEqual(checked, [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
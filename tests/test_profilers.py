@@ -0,0 +1,106 @@
+import collections.abc as collections_abc
+import contextlib
+import io
+import threading
+import tracemalloc
+import unittest
+
+import utils.profilers as profiler_utils
+
+TRANSIENT_SIZE = 4_000_000
+
+
+def allocate_transient(count: int) -> collections_abc.Iterator[int]:
+    for i in range(count):
+        buffer = bytearray(TRANSIENT_SIZE)
+        del buffer
+        yield i
+
+
+def get_peak(stats: profiler_utils.StageStats) -> int:
+    assert stats.peak_memory is not None
+    return stats.peak_memory
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_stage_peak_includes_transient_allocations(self) -> None:
+        profiler = profiler_utils.Profiler()
+        items = profiler.wrap(allocate_transient(3), "inner")
+        self.assertEqual(list(profiler.wrap(items, "outer")), [0, 1, 2])
+
+        self.assertGreaterEqual(get_peak(profiler.stages["inner"]), TRANSIENT_SIZE)
+        self.assertGreaterEqual(get_peak(profiler.stages["outer"]), TRANSIENT_SIZE)
+        self.assertEqual(profiler.stages["inner"].items, 3)
+
+    def test_peak_before_nested_stage_is_kept(self) -> None:
+        profiler = profiler_utils.Profiler()
+
+        def outer() -> collections_abc.Iterator[int]:
+            buffer = bytearray(TRANSIENT_SIZE)
+            del buffer
+            yield from profiler.wrap(iter([1]), "inner")
+
+        list(profiler.wrap(outer(), "outer"))
+        self.assertGreaterEqual(get_peak(profiler.stages["outer"]), TRANSIENT_SIZE)
+        self.assertLess(get_peak(profiler.stages["inner"]), TRANSIENT_SIZE)
+
+    def test_tracing_stops_after_concurrent_profiling(self) -> None:
+        def run() -> None:
+            for _ in range(20):
+                list(profiler_utils.Profiler().wrap(allocate_transient(2), "stage"))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_concurrent_stages_do_not_report_memory(self) -> None:
+        barrier = threading.Barrier(2)
+        profiler = profiler_utils.Profiler()
+
+        def gen_items() -> collections_abc.Iterator[int]:
+            barrier.wait()
+            yield from allocate_transient(2)
+            barrier.wait()
+
+        def run(name: str) -> None:
+            list(profiler.wrap(gen_items(), name))
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ["first", "second"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for name in ["first", "second"]:
+            self.assertIsNone(profiler.stages[name].peak_memory)
+            self.assertEqual(profiler.stages[name].items, 2)
+            self.assertGreater(profiler.stages[name].total_time, 0)
+
+        list(profiler.wrap(allocate_transient(1), "after"))
+        self.assertGreaterEqual(get_peak(profiler.stages["after"]), TRANSIENT_SIZE)
+
+
+class ProfileTest(unittest.TestCase):
+    def test_iterator_result_returns_stats_without_printing(self) -> None:
+        @profiler_utils.profile
+        def gen_items(count: int) -> collections_abc.Iterator[int]:
+            return allocate_transient(count)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            items = gen_items(3)
+            self.assertEqual(list(items), [0, 1, 2])
+            del items
+        self.assertEqual(output.getvalue(), "")
+
+        items = gen_items(2)
+        self.assertIsInstance(items, profiler_utils.ProfiledIterator)
+        list(items)
+        self.assertEqual(items.stats.items, 2)
+        self.assertGreaterEqual(get_peak(items.stats), TRANSIENT_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
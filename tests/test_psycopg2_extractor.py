@@ -0,0 +1,68 @@
+import collections.abc as collections_abc
+import contextlib
+import dataclasses
+import typing
+import unittest
+
+import postgres
+import psycopg2.extensions as psycopg2_extensions
+
+import utils.psycopg2 as psycopg2_utils
+
+
+@dataclasses.dataclass
+class Event:
+    id: int
+    group_id: int
+
+
+class ExtractorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        self.connection = stack.enter_context(postgres.open_test_connection())
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE events(id integer PRIMARY KEY, group_id integer NOT NULL)")
+            cursor.execute("INSERT INTO events SELECT i, i / 3 FROM generate_series(0, 19) AS i")
+        self.connection.commit()
+        self.extractor = psycopg2_utils.Extractor(self.connection, 4)
+
+    def assert_idle(self) -> None:
+        self.assertEqual(self.connection.info.transaction_status, psycopg2_extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_cursor_ends_its_transaction(self) -> None:
+        events = list(self.extractor.extract_with_cursor(Event, "events", order_by=["id"]))
+        self.assertEqual([event.id for event in events], list(range(20)))
+        self.assert_idle()
+
+        items = typing.cast(
+            collections_abc.Generator[Event, None, None], self.extractor.extract_with_cursor(Event, "events")
+        )
+        next(items)
+        items.close()
+        self.assert_idle()
+
+    def test_caller_transaction_is_left_open(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute("INSERT INTO events VALUES (100, 100)")
+        self.assertEqual(len(list(self.extractor.extract_with_keyset(Event, "events", key=["id"]))), 21)
+        self.assertEqual(len(list(self.extractor.extract_with_cursor(Event, "events"))), 21)
+        self.assertEqual(self.connection.info.transaction_status, psycopg2_extensions.TRANSACTION_STATUS_INTRANS)
+        self.connection.rollback()
+
+    def test_keyset_pages(self) -> None:
+        pages = list(self.extractor.extract_pages_with_keyset(Event, "events", key=["group_id", "id"], after=[1, 4]))
+        self.assertEqual(
+            [[event.id for event in page] for page in pages],
+            [[5, 6, 7, 8], [9, 10, 11, 12], [13, 14, 15, 16], [17, 18, 19]],
+        )
+        self.assert_idle()
+
+    def test_keyset_rejects_non_unique_key(self) -> None:
+        with self.assertRaises(ValueError):
+            list(self.extractor.extract_with_keyset(Event, "events", key=["group_id"]))
+        self.assert_idle()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import dataclasses
+import typing
+import unittest
+
+import postgres
+import psycopg2
+
+import utils.psycopg2 as psycopg2_utils
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+
+
+@dataclasses.dataclass
+class Email:
+    user_id: int
+    email: str
+
+
+class FailingCursor:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def copy_expert(self, stmt: str, file: typing.Any) -> None:
+        raise self.error
+
+    def __enter__(self) -> "FailingCursor":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        ...
+
+
+class RecordingConnection:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+        self.calls: list[str] = []
+
+    def cursor(self) -> FailingCursor:
+        return FailingCursor(self.error)
+
+    def commit(self) -> None:
+        self.calls.append("commit")
+
+    def rollback(self) -> None:
+        self.calls.append("rollback")
+
+
+class FanOutLoaderTest(unittest.TestCase):
+    def test_flush_rolls_back_on_base_exception(self) -> None:
+        connection = RecordingConnection(KeyboardInterrupt())
+        loader = psycopg2_utils.FanOutLoader(connection, 2, tables=[(User, "users")])  # type: ignore[arg-type]
+        with self.assertRaises(KeyboardInterrupt):
+            loader.load_from_iterable([User(id=1), User(id=2)])
+        self.assertEqual(connection.calls, ["rollback"])
+        self.assertEqual(loader.counts, {"users": 0})
+
+    def test_unknown_type_is_rejected(self) -> None:
+        connection = RecordingConnection(KeyboardInterrupt())
+        loader = psycopg2_utils.FanOutLoader(connection, 2, tables=[(User, "users")])  # type: ignore[arg-type]
+        with self.assertRaisesRegex(TypeError, "Email"):
+            loader.load_from_iterable([Email(user_id=1, email="")])
+
+
+class FanOutLoaderIntegrationTest(unittest.TestCase):
+    def test_failed_chunk_is_rolled_back(self) -> None:
+        with postgres.open_test_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE TEMPORARY TABLE fan_out_users(id integer PRIMARY KEY)")
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE fan_out_emails("
+                    "user_id integer NOT NULL REFERENCES fan_out_users(id), email text NOT NULL)"
+                )
+            connection.commit()
+            loader = psycopg2_utils.FanOutLoader(
+                connection, 4, tables=[(User, "fan_out_users"), (Email, "fan_out_emails")]
+            )
+            items = [User(id=1), Email(user_id=1, email="a"), User(id=2), Email(user_id=2, email="b")]
+            items += [User(id=3), Email(user_id=4, email="c")]
+            with self.assertRaises(psycopg2.IntegrityError):
+                loader.load_from_iterable(items)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT (SELECT count(*) FROM fan_out_users), (SELECT count(*) FROM fan_out_emails)")
+                self.assertEqual(cursor.fetchone(), (2, 2))
+            self.assertEqual(loader.counts, {"fan_out_users": 2, "fan_out_emails": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
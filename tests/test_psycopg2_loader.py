@@ -0,0 +1,21 @@
+import unittest
+
+import utils.psycopg2.loader as loader_utils
+
+
+class ValuesStatementTest(unittest.TestCase):
+    def test_values_stmt(self) -> None:
+        self.assertEqual(
+            loader_utils._build_values_stmt("users", ("id", "name"), 3),
+            "INSERT INTO users (id,name) VALUES (%s, %s),(%s, %s),(%s, %s)",
+        )
+
+    def test_cache_does_not_grow_with_chunk_length(self) -> None:
+        loader_utils._build_values_parts.cache_clear()
+        for rows_count in range(1, 500):
+            loader_utils._build_values_stmt("users", ("id", "name"), rows_count)
+        self.assertEqual(loader_utils._build_values_parts.cache_info().currsize, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import collections.abc as collections_abc
+import contextlib
+import dataclasses
+import typing
+import unittest
+
+import postgres
+
+import utils.psycopg2 as psycopg2_utils
+import utils.psycopg2.loader as loader_utils
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+    name: str
+    age: int
+
+
+class RecordingCursor:
+    def __init__(self, statements: list[str]):
+        self.statements = statements
+        self.query: typing.Optional[bytes] = None
+
+    def execute(self, stmt: str, params: typing.Any = None) -> None:
+        self.statements.append(stmt)
+        self.query = stmt.encode()
+
+    def copy_expert(self, stmt: str, file: typing.Any) -> None:
+        self.statements.append(stmt)
+        file.read()
+
+    def __enter__(self) -> "RecordingCursor":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        ...
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def cursor(self) -> RecordingCursor:
+        return RecordingCursor(self.statements)
+
+    def commit(self) -> None:
+        self.statements.append("COMMIT")
+
+
+class UpsertStatementTest(unittest.TestCase):
+    def test_upsert_stmt(self) -> None:
+        stmt = loader_utils._build_upsert_stmt("users", ("id", "name", "age"), 2, ("id",), ("name", "age"))
+        self.assertEqual(
+            stmt,
+            "INSERT INTO users (id,name,age) VALUES (%s, %s, %s),(%s, %s, %s)"
+            " ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, age = EXCLUDED.age",
+        )
+
+    def test_upsert_without_update_columns_does_nothing(self) -> None:
+        self.assertEqual(loader_utils._build_conflict_clause(("id", "name"), ()), " ON CONFLICT (id, name) DO NOTHING")
+
+    def test_update_columns_default_to_non_key_columns(self) -> None:
+        self.assertEqual(
+            loader_utils._get_upsert_columns(("id", "name", "age"), ["id"], None), (("id",), ("name", "age"))
+        )
+        with self.assertRaises(ValueError):
+            loader_utils._get_upsert_columns(("id", "name"), ["email"], None)
+        with self.assertRaises(ValueError):
+            loader_utils._get_upsert_columns(("id", "name"), [], None)
+
+    def test_staging_and_merge_stmts(self) -> None:
+        self.assertEqual(
+            loader_utils._build_staging_stmt("users", "staging_x", ("id", "name")),
+            "CREATE TEMPORARY TABLE staging_x ON COMMIT DELETE ROWS AS SELECT id,name FROM users WITH NO DATA",
+        )
+        self.assertEqual(
+            loader_utils._build_merge_stmt("users", "staging_x", ("id", "name"), ("id",), ("name",)),
+            "INSERT INTO users (id,name) SELECT id,name FROM staging_x"
+            " ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name",
+        )
+
+    def test_copy_upsert_creates_staging_table_once(self) -> None:
+        connection = RecordingConnection()
+        loader = psycopg2_utils.Loader(typing.cast(psycopg2_utils.Connection, connection), 2)
+        loader.copy_upsert_from_iterable((User(id=i, name="", age=i) for i in range(5)), User, "users", ["id"])
+        kinds = [stmt.split()[0] for stmt in connection.statements]
+        self.assertEqual(
+            kinds,
+            ["CREATE", *["COPY", "INSERT", "COMMIT"] * 3, "DROP", "COMMIT"],
+        )
+
+    def test_copy_upsert_without_rows_creates_nothing(self) -> None:
+        connection = RecordingConnection()
+        loader = psycopg2_utils.Loader(typing.cast(psycopg2_utils.Connection, connection), 2)
+        loader.copy_upsert_from_iterable([], User, "users", ["id"])
+        self.assertEqual(connection.statements, [])
+
+
+class UpsertIntegrationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        stack = contextlib.ExitStack()
+        self.addCleanup(stack.close)
+        self.connection = stack.enter_context(postgres.open_test_connection())
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE users(id integer PRIMARY KEY, name text NOT NULL, age integer)")
+        self.connection.commit()
+
+    def fetch_users(self) -> list[tuple[int, str, int]]:
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT id, name, age FROM users ORDER BY id")
+            return cursor.fetchall()
+
+    def run_upserts(self, upsert: collections_abc.Callable[..., None]) -> None:
+        upsert((User(id=i, name=f"user {i}", age=i) for i in range(10)), User, "users", ["id"])
+        upsert(
+            [User(id=i, name="old", age=0) for i in range(5, 15)]
+            + [User(id=i, name="new", age=1) for i in range(5, 15)],
+            User,
+            "users",
+            ["id"],
+            ["name"],
+        )
+        self.assertEqual(
+            self.fetch_users(),
+            [(i, f"user {i}", i) for i in range(5)] + [(i, "new", i if i < 10 else 0) for i in range(5, 15)],
+        )
+
+    def test_values_upsert(self) -> None:
+        self.run_upserts(psycopg2_utils.Loader(self.connection, 4).upsert_from_iterable)
+
+    def test_copy_upsert(self) -> None:
+        self.run_upserts(psycopg2_utils.Loader(self.connection, 4).copy_upsert_from_iterable)
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM pg_class WHERE relname LIKE 'staging\\_%' AND relpersistence = 't'")
+            self.assertEqual(cursor.fetchone(), (0,))
+
+
+if __name__ == "__main__":
+    unittest.main()
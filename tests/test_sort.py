@@ -0,0 +1,60 @@
+import dataclasses
+import random
+import typing
+import unittest
+import unittest.mock
+
+import utils.sort as sort_utils
+
+MEMORY_BUDGET = 20_000
+
+
+@dataclasses.dataclass
+class Event:
+    id: int
+    payload: str
+
+
+def gen_events(count: int) -> list[Event]:
+    events = [Event(id=i, payload=f"event {i:06}") for i in range(count)]
+    random.Random(42).shuffle(events)
+    return events
+
+
+class ExternalSortTest(unittest.TestCase):
+    def sort_with_runs(self, events: list[Event], **kwargs: typing.Any) -> tuple[list[Event], list[int]]:
+        run_sizes: list[int] = []
+        write_run = sort_utils._write_run
+
+        def spy(items: list[Event], directory: str, block_size: int) -> sort_utils.spill_utils.SpillFile:
+            run = write_run(items, directory, block_size)
+            run_sizes.append(run.count)
+            return run
+
+        with unittest.mock.patch.object(sort_utils, "_write_run", spy):
+            result = list(sort_utils.external_sort(events, key=lambda event: event.id, max_fan_in=4, **kwargs))
+        return result, run_sizes
+
+    def test_memory_budget_bounds_runs(self) -> None:
+        events = gen_events(10_000)
+        result, run_sizes = self.sort_with_runs(events, memory_budget=MEMORY_BUDGET)
+        self.assertEqual(result, sorted(events, key=lambda event: event.id))
+        self.assertGreater(len(run_sizes), 4)
+        for run_size in run_sizes[: len(run_sizes) // 2]:
+            self.assertLessEqual(sort_utils.estimate_items_size(events[:run_size]), MEMORY_BUDGET * 1.1)
+
+    def test_small_input_is_sorted_in_memory(self) -> None:
+        events = gen_events(100)
+        result, run_sizes = self.sort_with_runs(events, memory_budget=MEMORY_BUDGET, run_size=1000)
+        self.assertEqual(result, sorted(events, key=lambda event: event.id))
+        self.assertEqual(run_sizes, [])
+
+    def test_run_size_still_applies(self) -> None:
+        events = gen_events(1000)
+        result, run_sizes = self.sort_with_runs(events, run_size=300)
+        self.assertEqual(result, sorted(events, key=lambda event: event.id))
+        self.assertEqual(run_sizes[:4], [300, 300, 300, 100])
+
+
+if __name__ == "__main__":
+    unittest.main()
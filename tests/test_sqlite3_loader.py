@@ -0,0 +1,59 @@
+import dataclasses
+import sqlite3
+import unittest
+
+import utils.sqlite3 as sqlite3_utils
+
+
+@dataclasses.dataclass
+class User:
+    id: int
+    name: str
+
+
+class LoaderTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.connection = sqlite3_utils.Connection(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute("CREATE TABLE users(id integer primary key, name text NOT NULL)")
+        self.connection.commit()
+
+    def count_users(self) -> int:
+        (count,) = self.connection.execute("SELECT count(*) FROM users").fetchone()
+        return int(count)
+
+    def test_loads_in_chunks(self) -> None:
+        for fast_ingest in [False, True]:
+            with self.subTest(fast_ingest=fast_ingest):
+                self.connection.execute("DELETE FROM users")
+                self.connection.commit()
+                loader = sqlite3_utils.Loader(self.connection, 3, fast_ingest=fast_ingest)
+                loader.load_from_iterable((User(id=i, name=str(i)) for i in range(10)), User, "users")
+                self.assertFalse(self.connection.in_transaction)
+                self.assertEqual(self.count_users(), 10)
+
+    def test_open_transaction_is_refused(self) -> None:
+        self.connection.execute("INSERT INTO users VALUES (100, 'pending')")
+        loaders = [
+            sqlite3_utils.Loader(self.connection, 3),
+            sqlite3_utils.Loader(self.connection, 3, fast_ingest=True),
+        ]
+        for loader in loaders:
+            with self.assertRaises(ValueError):
+                loader.load_from_iterable([User(id=1, name="1")], User, "users")
+        with self.assertRaises(ValueError):
+            sqlite3_utils.FanOutLoader(self.connection, 3, tables=[(User, "users")]).load_from_iterable([])
+        self.assertTrue(self.connection.in_transaction)
+        self.connection.rollback()
+        self.assertEqual(self.count_users(), 0)
+
+    def test_failed_chunk_is_rolled_back(self) -> None:
+        users = [User(id=i % 5, name=str(i)) for i in range(8)]
+        with self.assertRaises(sqlite3.IntegrityError):
+            sqlite3_utils.Loader(self.connection, 4).load_from_iterable(users, User, "users")
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.count_users(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
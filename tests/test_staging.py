@@ -0,0 +1,102 @@
+import dataclasses
+import datetime
+import os
+import struct
+import tempfile
+import typing
+import unittest
+
+import utils.staging as staging_utils
+
+
+@dataclasses.dataclass
+class Row:
+    id: int
+    name: str
+    score: typing.Optional[float]
+    active: bool
+    payload: bytes
+    created_at: datetime.date
+
+
+ROWS = [
+    Row(id=1, name="first\tname", score=1.5, active=True, payload=b"\x00\xff", created_at=datetime.date(2024, 1, 1)),
+    Row(id=-(2**63), name="", score=None, active=False, payload=b"", created_at=datetime.date(2024, 1, 2)),
+    Row(id=2**63 - 1, name="ünïcode", score=-0.0, active=True, payload=b"x" * 1000, created_at=datetime.date.max),
+]
+
+
+class StagingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "rows.stage")
+
+    def write(self, rows: list[Row]) -> None:
+        with staging_utils.StagingWriter(self.path, Row) as writer:
+            writer.write_many(rows)
+
+    def test_round_trip(self) -> None:
+        self.write(ROWS)
+        with staging_utils.StagingReader(self.path) as reader:
+            self.assertEqual(len(reader), 3)
+            self.assertEqual(list(reader.rows(Row)), ROWS)
+            self.assertEqual(list(reader.rows(Row, start=1)), ROWS[1:])
+            self.assertEqual(reader.record(-1).to_tuple(), dataclasses.astuple(ROWS[-1]))
+            self.assertEqual(bytes(reader.record(0).raw(1)), b"first\tname")
+            with self.assertRaises(IndexError):
+                reader.record(3)
+
+    def test_offsets_are_little_endian(self) -> None:
+        self.write(ROWS)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        index_offset, count, _ = struct.unpack_from(f"<QQ{len(staging_utils.MAGIC)}s", data, len(data) - 24)
+        offsets = struct.unpack_from(f"<{count}Q", data, index_offset)
+        (header_length,) = struct.unpack_from("<I", data, len(staging_utils.MAGIC))
+        self.assertEqual(offsets[0], len(staging_utils.MAGIC) + 4 + header_length)
+        self.assertLess(offsets[0], offsets[1])
+        self.assertLess(offsets[-1], index_offset)
+
+    def test_failed_write_leaves_no_file(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            with staging_utils.StagingWriter(self.path, Row) as writer:
+                writer.write(ROWS[0])
+                raise ZeroDivisionError
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_truncated_file_is_rejected(self) -> None:
+        self.write(ROWS)
+        size = os.path.getsize(self.path)
+        for truncated_size in [0, 10, size // 2, size - 1]:
+            with self.subTest(size=truncated_size):
+                with open(self.path, "r+b") as file:
+                    file.truncate(truncated_size)
+                with self.assertRaises(ValueError):
+                    staging_utils.StagingReader(self.path)
+                self.write(ROWS)
+
+    def test_corrupted_index_is_rejected(self) -> None:
+        self.write(ROWS)
+        with open(self.path, "r+b") as file:
+            data = file.read()
+            index_offset = struct.unpack_from("<Q", data, len(data) - 24)[0]
+            file.seek(index_offset)
+            file.write(struct.pack("<Q", index_offset + 1000))
+        with staging_utils.StagingReader(self.path) as reader:
+            self.assertEqual(reader.record(1).to_tuple(), dataclasses.astuple(ROWS[1]))
+            with self.assertRaises(ValueError):
+                reader.record(0)
+
+    def test_close_with_live_records_raises(self) -> None:
+        self.write(ROWS)
+        reader = staging_utils.StagingReader(self.path)
+        record = reader.record(0)
+        with self.assertRaises(BufferError):
+            reader.close()
+        del record
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import dataclasses
+import unittest
+
+import utils.synthetic as synthetic_utils
+
+SEED = 42
+COUNT = 2 * synthetic_utils.BLOCK_SIZE + 123
+
+
+@dataclasses.dataclass
+class Event:
+    id: int
+    user_id: int
+    kind: str
+
+
+COLUMNS: dict[str, synthetic_utils.Column] = {
+    "id": synthetic_utils.Sequence(start=1),
+    "user_id": synthetic_utils.Zipf(1000),
+    "kind": synthetic_utils.Choice(("click", "view", "buy")),
+}
+
+
+class GenerateRowsTest(unittest.TestCase):
+    def test_same_seed_gives_same_rows(self) -> None:
+        rows = list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED))
+        self.assertEqual(len(rows), COUNT)
+        self.assertEqual([row.id for row in rows], list(range(1, COUNT + 1)))
+        self.assertEqual(rows, list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED)))
+        self.assertNotEqual(rows, list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED + 1)))
+
+    def test_rows_do_not_depend_on_count(self) -> None:
+        rows = list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED))
+        for count in [1, 30, synthetic_utils.BLOCK_SIZE + 1]:
+            self.assertEqual(list(synthetic_utils.generate_rows(Event, COLUMNS, count, SEED)), rows[:count])
+
+    def test_rows_do_not_depend_on_workers(self) -> None:
+        rows = list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED))
+        self.assertEqual(list(synthetic_utils.generate_rows(Event, COLUMNS, COUNT, SEED, max_workers=2)), rows)
+
+
+if __name__ == "__main__":
+    unittest.main()